@@ -12,12 +12,13 @@ matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import sys
-import yaml
 import logging
 
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
+from src.config import load_config
 from src.models.disproportionality import run_disproportionality_analysis
 from src.viz.volcano_plots import plot_volcano, plot_heatmap
 
@@ -36,50 +37,61 @@ logger.info("="*60)
 logger.info("Disproportionality Analysis")
 logger.info("="*60)
 
-# Load config
-config_path = Path(__file__).parent / 'config' / 'data_config.yaml'
-with open(config_path, 'r') as f:
-    config = yaml.safe_load(f)
-
-# Load processed data
-data_path = Path(__file__).parent / config['data_paths']['processed'] / 'drug_ae_counts.csv'
-logger.info(f"Loading data from {data_path}")
-df = pd.read_csv(data_path)
+# Load config (cached across scripts in the same process)
+config = load_config()
+
+# Load processed data (parquet preferred: typed, compressed, no string parse)
+processed_dir = Path(__file__).parent / config['data_paths']['processed']
+parquet_path = processed_dir / 'drug_ae_counts.parquet'
+if parquet_path.exists():
+    logger.info(f"Loading data from {parquet_path}")
+    df = pd.read_parquet(parquet_path)
+else:
+    data_path = processed_dir / 'drug_ae_counts.csv'
+    logger.info(f"Loading data from {data_path}")
+    # Stream the CSV and aggregate incrementally so peak memory is
+    # bounded by chunk size rather than file size
+    counts = None
+    for chunk in pd.read_csv(
+        data_path,
+        chunksize=500_000,
+        usecols=['normalized_name', 'ae_category', 'count'],
+        dtype={'count': 'int32'}
+    ):
+        partial = chunk.groupby(['normalized_name', 'ae_category'])['count'].sum()
+        counts = partial if counts is None else counts.add(partial, fill_value=0)
+    df = counts.astype('int64').reset_index()
+
+# Low-cardinality string columns: categorical dtype shrinks memory and
+# speeds every downstream groupby/mask
+for col in ['normalized_name', 'ae_category']:
+    df[col] = df[col].astype('category')
 
 logger.info(f"Data shape: {df.shape}")
 logger.info(f"Drugs analyzed: {len(df['normalized_name'].unique())}")
 logger.info(f"AE categories: {len(df['ae_category'].unique())}")
 
-# Prepare data for disproportionality analysis
-# Expand counts into individual records for contingency table construction
-logger.info("Expanding drug-AE counts into individual records...")
-expanded_data = []
-for _, row in df.iterrows():
-    for _ in range(row['count']):
-        expanded_data.append({
-            'normalized_name': row['normalized_name'],
-            'ae_category': row['ae_category']
-        })
-
-df_expanded = pd.DataFrame(expanded_data)
-logger.info(f"Expanded to {len(df_expanded):,} records")
+# The (drug, ae, count) table already holds the contingency counts;
+# pass it straight through instead of expanding to one row per report
+logger.info(f"Total reports: {df['count'].sum():,}")
 
-# Get unique drugs and categories
-drug_list = df['normalized_name'].unique().tolist()
-ae_list = df['ae_category'].unique().tolist()
+# Get unique drugs and categories (categories are already deduplicated)
+drug_list = df['normalized_name'].cat.categories.tolist()
+ae_list = df['ae_category'].cat.categories.tolist()
 
 logger.info(f"Analyzing {len(drug_list)} drugs × {len(ae_list)} AE categories")
 
 # Run analysis
 logger.info("Computing disproportionality metrics...")
 results = run_disproportionality_analysis(
-    df_expanded,
+    df,
     drug_col='normalized_name',
     drug_list=drug_list,
     event_col='ae_category',
     event_list=ae_list,
     min_count=5,
-    min_drug_reports=10
+    min_drug_reports=10,
+    count_col='count'
 )
 
 logger.info(f"Found {len(results)} significant drug-event pairs")
@@ -88,7 +100,7 @@ logger.info(f"Signals detected: {results['is_signal'].sum()}")
 # Save results
 results_path = Path(__file__).parent / 'results' / 'tables' / 'disproportionality_results.csv'
 results_path.parent.mkdir(parents=True, exist_ok=True)
-results.to_csv(results_path, index=False)
+results.to_csv(results_path, index=False, float_format='%.5g')
 logger.info(f"Results saved to {results_path}")
 
 # Create visualizations
@@ -96,21 +108,29 @@ logger.info("Generating visualizations...")
 figures_dir = Path(__file__).parent / 'results' / 'figures'
 figures_dir.mkdir(parents=True, exist_ok=True)
 
-# Volcano plots for top drugs
+# Compute per-drug row indices once; every per-drug consumer below takes
+# its rows by position instead of rescanning or copying group frames
+drug_groups = results.groupby('drug', sort=False).indices
+
+# Volcano plots for top drugs (reuse one figure across drugs)
 top_drugs = df['normalized_name'].value_counts().head(6).index.tolist()
+fig, ax = plt.subplots(figsize=(10, 8))
+n_volcano_plots = 0
 for drug in top_drugs:
     try:
-        fig, ax = plot_volcano(
-            results,
-            drug_name=drug,
-            top_n=10
-        )
+        group_idx = drug_groups.get(drug)
+        if group_idx is None:
+            continue
+        drug_results = results.take(group_idx)
+        if plot_volcano(drug_results, drug_name=drug, top_n=10, ax=ax) is None:
+            continue
         save_path = figures_dir / f'volcano_{drug.lower().replace(" ", "_")}.png'
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        logger.info(f"Saved volcano plot: {save_path.name}")
+        fig.savefig(save_path, dpi=150, bbox_inches='tight')
+        n_volcano_plots += 1
     except Exception as e:
         logger.error(f"Error creating volcano plot for {drug}: {e}")
+plt.close(fig)
+logger.info(f"Saved {n_volcano_plots} volcano plots to {figures_dir}")
 
 # Heatmap
 try:
@@ -131,12 +151,21 @@ except Exception as e:
 tables_dir = Path(__file__).parent / 'results' / 'tables'
 tables_dir.mkdir(parents=True, exist_ok=True)
 
-for drug in drug_list:
-    drug_results = results[results['drug'] == drug].nlargest(50, 'ror')
-    if len(drug_results) > 0:
-        save_path = tables_dir / f'{drug.lower().replace(" ", "_")}_top50_signals.csv'
-        drug_results.to_csv(save_path, index=False)
-        logger.info(f"Saved top signals for {drug}: {len(drug_results)} pairs")
+# Write per-drug CSVs in parallel (I/O-bound)
+def _save_drug_top50(drug):
+    drug_results = results.take(drug_groups[drug]).nlargest(50, 'ror')
+    if len(drug_results) == 0:
+        return drug, 0
+    save_path = tables_dir / f'{drug.lower().replace(" ", "_")}_top50_signals.csv'
+    drug_results.to_csv(save_path, index=False, float_format='%.5g')
+    return drug, len(drug_results)
+
+
+# Log one summary rather than one line per drug; per-iteration logging
+# dominates once the drug list grows
+with ThreadPoolExecutor(max_workers=8) as executor:
+    n_tables = sum(1 for _, n_pairs in executor.map(_save_drug_top50, drug_groups) if n_pairs > 0)
+logger.info(f"Saved top-50 signal tables for {n_tables} drugs to {tables_dir}")
 
 logger.info("="*60)
 logger.info("Disproportionality analysis complete")
@@ -13,7 +13,6 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 import sys
-import yaml
 import logging
 
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
@@ -25,11 +24,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+from src.config import load_config
 from src.models.multilabel_classifier import (
     prepare_features,
     train_baseline_models,
     evaluate_models,
-    get_feature_importance
+    get_feature_importance,
+    stack_proba_columns
 )
 from src.viz.roc_curves import plot_roc_curves, plot_feature_importance, plot_metrics_comparison
 
@@ -40,15 +41,57 @@ logger.info("="*60)
 logger.info("Multi-Label AE Prediction Model")
 logger.info("="*60)
 
-# Load config
-config_path = Path(__file__).parent / 'config' / 'data_config.yaml'
-with open(config_path, 'r') as f:
-    config = yaml.safe_load(f)
+# Load config (cached across scripts in the same process)
+config = load_config()
+
+# Load ML dataset (parquet preferred: typed, compressed, no string parse)
+processed_dir = Path(__file__).parent / config['data_paths']['processed']
+parquet_path = processed_dir / 'cases_ml.parquet'
+# Only load the columns the analysis uses
+wanted_cols = ['age_group', 'sex', 'drug_class', 'report_year',
+               'n_concomitant_drugs', 'has_cardio_comedication', 'has_insulin',
+               'cardiovascular', 'metabolic', 'musculoskeletal',
+               'gastrointestinal', 'renal']
+
+if parquet_path.exists():
+    logger.info(f"Loading ML dataset from {parquet_path}")
+    import pyarrow.parquet as pq
+    available = set(pq.read_schema(parquet_path).names)
+    df = pd.read_parquet(
+        parquet_path,
+        columns=[col for col in wanted_cols if col in available]
+    )
+else:
+    data_path = processed_dir / 'cases_ml.csv'
+    logger.info(f"Loading ML dataset from {data_path}")
+    # Stream the CSV in chunks so parse working memory stays bounded,
+    # with compact dtypes (targets are 0/1, the count feature is small)
+    csv_dtypes = {
+        'n_concomitant_drugs': 'int16',
+        'report_year': 'float32',
+        'cardiovascular': 'int8',
+        'metabolic': 'int8',
+        'musculoskeletal': 'int8',
+        'gastrointestinal': 'int8',
+        'renal': 'int8',
+    }
+    available = set(pd.read_csv(data_path, nrows=0).columns)
+    usecols = [col for col in wanted_cols if col in available]
+    df = pd.concat(
+        pd.read_csv(
+            data_path,
+            usecols=usecols,
+            chunksize=500_000,
+            dtype={col: t for col, t in csv_dtypes.items() if col in available}
+        ),
+        ignore_index=True
+    )
 
-# Load ML dataset
-data_path = Path(__file__).parent / config['data_paths']['processed'] / 'cases_ml.csv'
-logger.info(f"Loading ML dataset from {data_path}")
-df = pd.read_csv(data_path)
+# Low-cardinality string columns: categorical dtype shrinks memory and
+# speeds downstream encoding and masks
+for col in ['age_group', 'sex', 'drug_class']:
+    if col in df.columns:
+        df[col] = df[col].astype('category')
 
 logger.info(f"Dataset shape: {df.shape[0]:,} samples, {df.shape[1]} features")
 
@@ -74,6 +117,10 @@ X, y, feature_info = prepare_features(
     categorical_cols=['age_group', 'sex', 'drug_class']
 )
 
+# float32 features / int8 targets halve the memory handed to sklearn
+X = X.astype(np.float32)
+y = y.astype(np.int8)
+
 logger.info(f"Feature matrix: {X.shape[0]:,} samples × {X.shape[1]} features")
 logger.info(f"Target matrix: {y.shape[0]:,} samples × {y.shape[1]} categories")
 
@@ -82,19 +129,21 @@ logger.info("Splitting data (time-based)...")
 ml_split = config['ml_split']
 
 if 'report_year' in df.columns:
-    X['year'] = df['report_year'].values
-    
-    train_mask = (X['year'] >= int(ml_split['train_start'])) & (X['year'] <= int(ml_split['train_end']))
-    val_mask = (X['year'] >= int(ml_split['val_start'])) & (X['year'] <= int(ml_split['val_end']))
-    test_mask = (X['year'] >= int(ml_split['test_start'])) & (X['year'] <= int(ml_split['test_end']))
-    
-    X_train = X[train_mask].drop(columns=['year'])
-    X_val = X[val_mask].drop(columns=['year'])
-    X_test = X[test_mask].drop(columns=['year'])
-    
-    y_train = y[train_mask]
-    y_val = y[val_mask]
-    y_test = y[test_mask]
+    # Sort by year once, then carve out each split with binary search;
+    # the slices are contiguous views instead of three mask copies
+    years = pd.to_numeric(df['report_year'], errors='coerce').to_numpy()
+    order = np.argsort(years, kind='stable')
+    X_sorted = X.iloc[order]
+    y_sorted = y.iloc[order]
+    years_sorted = years[order]
+
+    def _year_slice(start, end):
+        lo, hi = np.searchsorted(years_sorted, [int(start), int(end) + 1])
+        return X_sorted.iloc[lo:hi], y_sorted.iloc[lo:hi]
+
+    X_train, y_train = _year_slice(ml_split['train_start'], ml_split['train_end'])
+    X_val, y_val = _year_slice(ml_split['val_start'], ml_split['val_end'])
+    X_test, y_test = _year_slice(ml_split['test_start'], ml_split['test_end'])
 else:
     # Random split if no year
     from sklearn.model_selection import train_test_split
@@ -117,7 +166,7 @@ logger.info(f"\nModel Performance:\n{metrics_df.to_string()}")
 # Save metrics
 metrics_path = Path(__file__).parent / 'results' / 'tables' / 'ml_metrics.csv'
 metrics_path.parent.mkdir(parents=True, exist_ok=True)
-metrics_df.to_csv(metrics_path, index=False)
+metrics_df.to_csv(metrics_path, index=False, float_format='%.5g')
 logger.info(f"Metrics saved to {metrics_path}")
 
 # Visualizations
@@ -131,11 +180,7 @@ best_model = models[best_model_name]
 
 logger.info(f"Best performing model: {best_model_name}")
 
-y_pred_proba = best_model.predict_proba(X_test)
-if isinstance(y_pred_proba, list):
-    y_pred_proba_array = np.array([proba[:, 1] for proba in y_pred_proba]).T
-else:
-    y_pred_proba_array = y_pred_proba
+y_pred_proba_array = stack_proba_columns(best_model.predict_proba(X_test))
 
 try:
     fig, axes = plot_roc_curves(
@@ -161,23 +206,27 @@ try:
     
     # Save feature importance
     importance_path = Path(__file__).parent / 'results' / 'tables' / 'feature_importance.csv'
-    importance_df.to_csv(importance_path, index=False)
+    importance_df.to_csv(importance_path, index=False, float_format='%.5g')
     logger.info(f"Saved feature importance: {importance_path.name}")
     
-    # Plot for top categories
+    # Plot for top categories (reuse one figure across categories)
+    fig, ax = plt.subplots(figsize=(10, 8))
+    n_importance_plots = 0
     for category in ae_categories[:3]:
         try:
-            fig, ax = plot_feature_importance(
+            plot_feature_importance(
                 importance_df,
                 target_category=category,
-                top_n=15
+                top_n=15,
+                ax=ax
             )
             save_path = figures_dir / f'feature_importance_{category}.png'
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            logger.info(f"Saved feature importance plot: {save_path.name}")
+            fig.savefig(save_path, dpi=150, bbox_inches='tight')
+            n_importance_plots += 1
         except Exception as e:
             logger.error(f"Error creating feature importance plot for {category}: {e}")
+    plt.close(fig)
+    logger.info(f"Saved {n_importance_plots} feature importance plots to {figures_dir}")
 except Exception as e:
     logger.error(f"Error getting feature importance: {e}")
 
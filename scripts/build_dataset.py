@@ -1,13 +1,15 @@
 """Build analysis-ready datasets from FAERS data."""
 
 import pandas as pd
-import yaml
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 import sys
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.config import load_config
 from src.data_ingest.load_faers import combine_quarters, standardize_column_names
 from src.data_ingest.dedupe_cases import dedupe_cases, get_latest_caseids
 from src.data_ingest.drug_normalizer import DrugNormalizer
@@ -18,24 +20,22 @@ from src.features.feature_engineering import create_ml_features
 def build_disproportionality_dataset(
     demo_df: pd.DataFrame,
     drug_df: pd.DataFrame,
-    reac_df: pd.DataFrame,
+    reac_df_mapped: pd.DataFrame,
     drug_normalizer: DrugNormalizer,
-    ae_mapper: AECategoryMapper,
     config: dict
 ) -> pd.DataFrame:
     """
     Build dataset for disproportionality analysis.
-    
+
     Creates drug-event pairs with counts for contingency tables.
-    
+
     Args:
         demo_df: Demographics dataframe (deduplicated)
         drug_df: Drug dataframe
-        reac_df: Reactions dataframe
+        reac_df_mapped: Reactions dataframe with 'ae_category' already mapped
         drug_normalizer: Drug normalizer instance
-        ae_mapper: AE category mapper instance
         config: Configuration dictionary
-        
+
     Returns:
         DataFrame with drug-AE category pairs and counts
     """
@@ -52,64 +52,70 @@ def build_disproportionality_dataset(
     drugname_col = 'drugname' if 'drugname' in drug_df_filtered.columns else 'drug'
     prod_ai_col = 'prod_ai' if 'prod_ai' in drug_df_filtered.columns else None
     
-    drug_info = drug_df_filtered.apply(
-        lambda row: drug_normalizer.normalize_and_classify(
-            row.get(drugname_col, '') if drugname_col in row.index else '',
-            row.get(prod_ai_col, '') if prod_ai_col and prod_ai_col in row.index else None
-        ),
-        axis=1
+    drug_df_filtered[['normalized_name', 'drug_class']] = drug_normalizer.normalize_and_classify_frame(
+        drug_df_filtered, drugname_col, prod_ai_col
     )
-    drug_df_filtered['normalized_name'] = drug_info.apply(lambda x: x['normalized_name'])
-    drug_df_filtered['drug_class'] = drug_info.apply(lambda x: x['drug_class'])
     
     # Filter to only target drugs
     drug_df_filtered = drug_df_filtered[drug_df_filtered['normalized_name'].notna()].copy()
-    
-    # Map reactions to categories
-    reac_df_mapped = ae_mapper.map_case_reactions(reac_df)
-    
+
+    # Categorical keys: the joins and the final count aggregation then
+    # run on int codes instead of Python string objects
+    drug_df_filtered['normalized_name'] = drug_df_filtered['normalized_name'].astype('category')
+    drug_df_filtered['drug_class'] = drug_df_filtered['drug_class'].astype('category')
+
+    case_reacs = reac_df_mapped[['caseid', 'ae_category']].dropna()
+    case_reacs = case_reacs.assign(ae_category=case_reacs['ae_category'].astype('category'))
+
     # Merge: cases -> drugs -> reactions
     # First, get cases with target drugs
     case_drugs = drug_df_filtered[['caseid', 'normalized_name', 'drug_class']].drop_duplicates()
-    
+
     # Merge with reactions
     case_drug_reac = case_drugs.merge(
-        reac_df_mapped[['caseid', 'ae_category']].dropna(),
+        case_reacs,
         on='caseid',
-        how='inner'
+        how='inner',
+        sort=False
     )
-    
+
     # Add demographics for stratification
     case_drug_reac = case_drug_reac.merge(
         demo_df[['caseid', 'age', 'sex']],
         on='caseid',
-        how='left'
+        how='left',
+        sort=False
     )
-    
+
     return case_drug_reac
 
 
 def build_ml_dataset(
     demo_df: pd.DataFrame,
     drug_df: pd.DataFrame,
-    reac_df: pd.DataFrame,
+    reac_df_mapped: pd.DataFrame,
     drug_normalizer: DrugNormalizer,
     ae_mapper: AECategoryMapper,
     config: dict
 ) -> pd.DataFrame:
     """
     Build dataset for ML models.
-    
+
     Creates case-level features with multi-label targets.
-    
+
+    Normalization runs over the full drug table (polypharmacy features
+    need non-suspect rows too), but the normalizer dispatches once per
+    unique drug-name string and maps results back, so the cost scales
+    with the number of distinct names rather than rows.
+
     Args:
         demo_df: Demographics dataframe (deduplicated)
         drug_df: Drug dataframe
-        reac_df: Reactions dataframe
+        reac_df_mapped: Reactions dataframe with 'ae_category' already mapped
         drug_normalizer: Drug normalizer instance
         ae_mapper: AE category mapper instance
         config: Configuration dictionary
-        
+
     Returns:
         DataFrame with features and labels
     """
@@ -117,15 +123,9 @@ def build_ml_dataset(
     drugname_col = 'drugname' if 'drugname' in drug_df.columns else 'drug'
     prod_ai_col = 'prod_ai' if 'prod_ai' in drug_df.columns else None
     
-    drug_info = drug_df.apply(
-        lambda row: drug_normalizer.normalize_and_classify(
-            row.get(drugname_col, '') if drugname_col in row.index else '',
-            row.get(prod_ai_col, '') if prod_ai_col and prod_ai_col in row.index else None
-        ),
-        axis=1
+    drug_df[['normalized_name', 'drug_class']] = drug_normalizer.normalize_and_classify_frame(
+        drug_df, drugname_col, prod_ai_col
     )
-    drug_df['normalized_name'] = drug_info.apply(lambda x: x['normalized_name'])
-    drug_df['drug_class'] = drug_info.apply(lambda x: x['drug_class'])
     
     # Filter to target drugs for suspect roles
     suspect_roles = config.get('suspect_roles', ['PS', 'SS'])
@@ -139,9 +139,6 @@ def build_ml_dataset(
         # If no role column, filter only by normalized_name
         target_drugs = drug_df[drug_df['normalized_name'].notna()].copy()
     
-    # Map reactions
-    reac_df_mapped = ae_mapper.map_case_reactions(reac_df)
-    
     # Get analysis categories
     ae_categories = ae_mapper.get_analysis_categories()
     
@@ -162,10 +159,8 @@ def build_ml_dataset(
 
 def main():
     """Main function to build datasets."""
-    # Load config
-    config_path = Path(__file__).parent.parent / "config" / "data_config.yaml"
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    # Load config (cached, shared with the analysis scripts)
+    config = load_config()
     
     # Paths
     data_dir = Path(config['data_paths']['raw_unpacked'])
@@ -181,28 +176,52 @@ def main():
     print("Building FAERS Analysis Datasets")
     print("="*60)
     
-    # Step 1: Load and combine all quarters
+    # Step 1: Load and combine all quarters, projecting each table to
+    # the columns the pipeline actually consumes
     print("\nStep 1: Loading FAERS tables...")
-    tables = combine_quarters(quarters, data_dir, tables=['DEMO', 'DRUG', 'REAC'])
+    table_columns = {
+        'DEMO': ['caseid', 'fda_dt', 'age', 'age_cod', 'sex'],
+        'DRUG': ['caseid', 'drugname', 'prod_ai', 'role_cod'],
+        'REAC': ['caseid', 'pt'],
+    }
+    tables = combine_quarters(
+        quarters, data_dir,
+        tables=['DEMO', 'DRUG', 'REAC'],
+        columns=table_columns
+    )
     
     demo_all = tables['DEMO']
     drug_all = tables['DRUG']
     reac_all = tables['REAC']
-    
-    # Save interim files
+
+    # Arrow-backed string dtype: .str ops and the hashing behind
+    # merges/groupbys run in Arrow C++ kernels instead of touching one
+    # Python object per element. Columns standardize_column_names
+    # already made categorical stay categorical (integer codes beat
+    # even Arrow strings for low-cardinality keys).
+    for frame, cols in (
+        (demo_all, ('caseid', 'fda_dt', 'age', 'age_cod', 'sex')),
+        (drug_all, ('caseid', 'drugname', 'prod_ai', 'role_cod')),
+        (reac_all, ('caseid', 'pt')),
+    ):
+        for col in cols:
+            if col in frame.columns and frame[col].dtype != 'category':
+                frame[col] = frame[col].astype('string[pyarrow]')
+    
+    # Save interim files as quarter-partitioned parquet datasets.
+    # Downstream readers only need a few columns, so columnar projection
+    # plus quarter partition pruning keeps reads to the data they touch.
     print("\nSaving interim files...")
-    try:
-        demo_all.to_parquet(interim_dir / "demo_all.parquet")
-        drug_all.to_parquet(interim_dir / "drug_all.parquet")
-        reac_all.to_parquet(interim_dir / "reac_all.parquet")
-        print("Saved interim files as parquet")
-    except ImportError:
-        # Fallback to CSV if parquet not available
-        print("Parquet not available, saving as CSV...")
-        demo_all.to_csv(interim_dir / "demo_all.csv", index=False)
-        drug_all.to_csv(interim_dir / "drug_all.csv", index=False)
-        reac_all.to_csv(interim_dir / "reac_all.csv", index=False)
-        print("Saved interim files as CSV")
+    for name, table_df in (('demo', demo_all), ('drug', drug_all), ('reac', reac_all)):
+        pq.write_to_dataset(
+            pa.Table.from_pandas(table_df, preserve_index=False),
+            root_path=str(interim_dir / name),
+            partition_cols=['quarter'],
+            row_group_size=262_144,
+            compression='snappy',
+            existing_data_behavior='delete_matching'
+        )
+    print(f"Saved interim datasets under {interim_dir} (partitioned by quarter)")
     
     # Step 2: Deduplicate cases
     print("\nStep 2: Deduplicating cases...")
@@ -217,27 +236,33 @@ def main():
     
     # Step 3: Initialize normalizers
     print("\nStep 3: Initializing drug normalizer and AE mapper...")
-    drug_normalizer = DrugNormalizer()
-    ae_mapper = AECategoryMapper()
-    
+    drug_normalizer = DrugNormalizer.load_or_build(interim_dir)
+    ae_mapper = AECategoryMapper.load_or_build(interim_dir)
+
+    # Map reactions to AE categories once; both builders consume the
+    # same mapped table
+    reac_mapped = ae_mapper.map_case_reactions(reac_all)
+
     # Step 4: Build disproportionality dataset
     print("\nStep 4: Building disproportionality dataset...")
     dispro_df = build_disproportionality_dataset(
         demo_deduped,
         drug_all,
-        reac_all,
+        reac_mapped,
         drug_normalizer,
-        ae_mapper,
         config
     )
     
     # Aggregate to drug-AE category counts
-    dispro_agg = dispro_df.groupby([
-        'normalized_name', 'drug_class', 'ae_category'
-    ]).size().reset_index(name='count')
+    # observed=True keeps the aggregation to combinations that actually
+    # occur rather than the cartesian product of all category levels
+    dispro_agg = dispro_df.groupby(
+        ['normalized_name', 'drug_class', 'ae_category'],
+        observed=True, sort=False
+    ).size().reset_index(name='count')
     
     try:
-        dispro_agg.to_parquet(processed_dir / "drug_ae_counts.parquet")
+        dispro_agg.to_parquet(processed_dir / "drug_ae_counts.parquet", compression='zstd')
         print(f"Saved: {processed_dir / 'drug_ae_counts.parquet'}")
     except ImportError:
         dispro_agg.to_csv(processed_dir / "drug_ae_counts.csv", index=False)
@@ -249,14 +274,14 @@ def main():
     ml_df = build_ml_dataset(
         demo_deduped,
         drug_all,
-        reac_all,
+        reac_mapped,
         drug_normalizer,
         ae_mapper,
         config
     )
     
     try:
-        ml_df.to_parquet(processed_dir / "cases_ml.parquet")
+        ml_df.to_parquet(processed_dir / "cases_ml.parquet", compression='zstd')
         print(f"Saved: {processed_dir / 'cases_ml.parquet'}")
     except ImportError:
         ml_df.to_csv(processed_dir / "cases_ml.csv", index=False)
@@ -1,14 +1,39 @@
 """Download FAERS quarterly data files."""
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import yaml
 from pathlib import Path
-import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
 import zipfile
 import io
 
 
+def make_session(pool_maxsize: int = 8, max_retries: int = 3) -> requests.Session:
+    """
+    Build a requests Session with connection pooling and backoff retries.
+
+    Shared across download threads so TCP/TLS connections are reused.
+
+    Args:
+        pool_maxsize: Max pooled connections per host
+        max_retries: Total retry attempts with exponential backoff
+
+    Returns:
+        Configured Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=max_retries, backoff_factor=1)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
 def get_faers_url(quarter: str) -> str:
     """
     Construct FAERS download URL for a quarter.
@@ -39,50 +64,52 @@ def get_faers_url(quarter: str) -> str:
     return patterns[0]  # Return first pattern, user may need to adjust
 
 
-def download_quarter(quarter: str, output_dir: Path, max_retries: int = 3) -> bool:
+def download_quarter(
+    quarter: str,
+    output_dir: Path,
+    session: Optional[requests.Session] = None
+) -> bool:
     """
     Download a single FAERS quarter.
-    
+
+    Retries with backoff are handled by the session's HTTPAdapter.
+
     Args:
         quarter: Quarter identifier
         output_dir: Directory to save zip file
-        max_retries: Maximum number of retry attempts
-        
+        session: Pooled session to download through (one is created if None)
+
     Returns:
         True if successful, False otherwise
     """
     url = get_faers_url(quarter)
     output_path = output_dir / f"faers_{quarter}.zip"
-    
+
     # Skip if already exists
     if output_path.exists():
         print(f"Already exists: {output_path}")
         return True
-    
+
     print(f"Downloading {quarter} from {url}...")
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, timeout=300, stream=True)
-            response.raise_for_status()
-            
-            # Save to file
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            print(f"Successfully downloaded {quarter} ({output_path.stat().st_size / 1e6:.1f} MB)")
-            return True
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Attempt {attempt + 1} failed for {quarter}: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(5)  # Wait before retry
-            else:
-                print(f"Failed to download {quarter} after {max_retries} attempts")
-                return False
-    
-    return False
+
+    if session is None:
+        session = make_session()
+
+    try:
+        response = session.get(url, timeout=300, stream=True)
+        response.raise_for_status()
+
+        # Stream to file in 1 MB chunks to avoid memory spikes
+        with open(output_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+
+        print(f"Successfully downloaded {quarter} ({output_path.stat().st_size / 1e6:.1f} MB)")
+        return True
+
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to download {quarter}: {e}")
+        return False
 
 
 def download_faers_data(config_path: str = None):
@@ -109,18 +136,24 @@ def download_faers_data(config_path: str = None):
     
     successful = 0
     failed = []
-    
-    for i, quarter in enumerate(quarters, 1):
-        print(f"\n[{i}/{len(quarters)}] Processing {quarter}...")
-        
-        if download_quarter(quarter, output_dir):
-            successful += 1
-        else:
-            failed.append(quarter)
-        
-        # Be nice to the server
-        time.sleep(2)
-    
+
+    # Downloads are latency-bound, so fetch quarters concurrently through
+    # one pooled session; the bounded worker count keeps us polite to the
+    # server without serializing every transfer
+    session = make_session()
+    with ThreadPoolExecutor(max_workers=config.get('download_workers', 4)) as executor:
+        futures = {
+            executor.submit(download_quarter, quarter, output_dir, session): quarter
+            for quarter in quarters
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            quarter = futures[future]
+            print(f"[{i}/{len(quarters)}] Finished {quarter}")
+            if future.result():
+                successful += 1
+            else:
+                failed.append(quarter)
+
     print(f"\n{'='*60}")
     print(f"Download complete: {successful}/{len(quarters)} successful")
     if failed:
@@ -0,0 +1,28 @@
+"""Shared configuration loading."""
+
+from functools import lru_cache
+from pathlib import Path
+import yaml
+
+# Prefer the libyaml C loader when available (much faster than pure Python)
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "data_config.yaml"
+
+
+@lru_cache(maxsize=1)
+def load_config() -> dict:
+    """
+    Load and cache the data configuration.
+
+    Repeated callers in the same process share one parsed dict instead of
+    re-running the YAML parser per script.
+
+    Returns:
+        Parsed configuration dictionary
+    """
+    with open(CONFIG_PATH, 'r') as f:
+        return yaml.load(f, Loader=_YamlLoader)
@@ -44,33 +44,44 @@ def dedupe_cases(
                 demo_df[date_col] = pd.to_datetime(demo_df[date_col], errors='coerce')
                 break
     
-    # Sort by caseid and date (descending)
-    demo_df = demo_df.sort_values([caseid_col, date_col], ascending=[True, False])
-    
-    # Keep first row per caseid (latest date)
-    deduped = demo_df.drop_duplicates(subset=[caseid_col], keep='first')
-    
-    return deduped.reset_index(drop=True)
+    # Hash-group per caseid and take the row with the latest date
+    # directly: O(N) vs the O(N log N) two-column sort + drop_duplicates,
+    # without materializing a fully reordered copy of the table
+    dates = demo_df[date_col].fillna(pd.Timestamp.min)
+    idx = dates.groupby(demo_df[caseid_col], sort=False).idxmax()
+
+    return demo_df.loc[idx].reset_index(drop=True)
 
 
 def get_latest_caseids(
     demo_df: pd.DataFrame,
     date_col: str = 'fda_dt',
     caseid_col: str = 'caseid'
-) -> pd.Series:
+) -> pd.Index:
     """
     Get set of caseids to keep (latest report per case).
-    
+
     Useful for filtering other tables (DRUG, REAC) before joining.
-    
+    Keeping only the latest report per case never changes *which*
+    caseids survive, so the sort+dedupe of `dedupe_cases` is skipped;
+    returning an Index also gives `.isin` callers a reusable hashtable.
+
     Args:
         demo_df: Demographics dataframe
-        date_col: Column name for date
+        date_col: Column name for date (unused, kept for API symmetry)
         caseid_col: Column name for case ID
-        
+
     Returns:
-        Series of caseids to keep
+        Index of caseids to keep
     """
-    deduped = dedupe_cases(demo_df, date_col, caseid_col)
-    return deduped[caseid_col].unique()
+    # Resolve alternative case ID column names as dedupe_cases does
+    if caseid_col not in demo_df.columns:
+        if 'primaryid' in demo_df.columns:
+            caseid_col = 'primaryid'
+        elif 'isr' in demo_df.columns:
+            caseid_col = 'isr'
+        else:
+            raise ValueError(f"Case ID column not found. Available: {demo_df.columns.tolist()}")
+
+    return pd.Index(demo_df[caseid_col].unique())
 
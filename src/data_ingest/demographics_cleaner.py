@@ -5,44 +5,39 @@ import numpy as np
 from typing import Optional
 
 
-def convert_age_to_years(row: pd.Series) -> float:
+# FAERS age unit codes -> multiplier to years (unknown units assume years)
+_AGE_UNIT_MULTIPLIERS = {
+    'YR': 1.0,
+    '': 1.0,
+    'DEC': 10.0,
+    'MON': 1 / 12,
+    'DY': 1 / 365,
+}
+
+
+def convert_ages_to_years(age: pd.Series, age_unit: pd.Series) -> pd.Series:
     """
-    Convert FAERS age field to years.
-    
+    Convert FAERS age values to years across a whole column.
+
     FAERS age can be in different units:
     - YR: Years (default)
     - DEC: Decades
     - MON: Months
     - DY: Days
-    
+
+    One vectorized multiply replaces a Python call per row.
+
     Args:
-        row: DataFrame row with 'age' and optionally 'age_cod' or 'age_unit'
-        
+        age: Series of raw age values (numeric or string)
+        age_unit: Series of age unit codes ('age_cod' / 'age_unit')
+
     Returns:
-        Age in years, or NaN if invalid/missing
+        Series of ages in years, NaN where invalid/missing
     """
-    age = row.get('age')
-    age_unit = row.get('age_cod', row.get('age_unit', 'YR')).upper()
-    
-    if pd.isna(age):
-        return np.nan
-    
-    try:
-        age = float(age)
-        
-        if age_unit == 'YR' or age_unit == '':
-            return age
-        elif age_unit == 'DEC':
-            return age * 10
-        elif age_unit == 'MON':
-            return age / 12
-        elif age_unit == 'DY':
-            return age / 365
-        else:
-            # Unknown unit, assume years
-            return age
-    except (ValueError, TypeError):
-        return np.nan
+    age_numeric = pd.to_numeric(age, errors='coerce')
+    units = age_unit.astype(str).str.upper().str.strip()
+    multiplier = units.map(_AGE_UNIT_MULTIPLIERS).fillna(1.0)
+    return age_numeric * multiplier
 
 
 def clean_demographics(demo_df: pd.DataFrame) -> pd.DataFrame:
@@ -63,42 +58,40 @@ def clean_demographics(demo_df: pd.DataFrame) -> pd.DataFrame:
         - age_years: Age converted to years
         - age_group: Binned age categories
     """
-    df = demo_df.copy()
-    
-    # Convert age to years
-    if 'age' in df.columns:
-        df['age_years'] = df.apply(convert_age_to_years, axis=1)
-        
+    # Build only the new columns and attach them via assign, instead of
+    # duplicating the whole frame up front just to overwrite three columns
+
+    # Convert age to years (vectorized over the whole column)
+    if 'age' in demo_df.columns:
+        if 'age_cod' in demo_df.columns:
+            age_unit = demo_df['age_cod']
+        elif 'age_unit' in demo_df.columns:
+            age_unit = demo_df['age_unit']
+        else:
+            age_unit = pd.Series('YR', index=demo_df.index)
+        age_years = convert_ages_to_years(demo_df['age'], age_unit)
+
         # Remove invalid ages (negative, >150)
-        df.loc[(df['age_years'] < 0) | (df['age_years'] > 150), 'age_years'] = np.nan
-        
+        age_years = age_years.where((age_years >= 0) & (age_years <= 150))
+
         # Age binning
-        df['age_group'] = pd.cut(
-            df['age_years'],
+        age_group = pd.cut(
+            age_years,
             bins=[0, 18, 45, 65, 75, 200],
             labels=['<18', '18-44', '45-64', '65-74', '75+'],
             include_lowest=True
         )
-        df['age_group'] = df['age_group'].cat.add_categories(['Unknown'])
-        df.loc[df['age_years'].isna(), 'age_group'] = 'Unknown'
+        age_group = age_group.cat.add_categories(['Unknown']).fillna('Unknown')
     else:
-        df['age_years'] = np.nan
-        df['age_group'] = 'Unknown'
-    
-    # Clean sex field
-    if 'sex' in df.columns:
-        # Standardize sex values
-        df['sex'] = df['sex'].str.upper().str.strip()
-        df['sex'] = df['sex'].replace({
-            '': 'UNK',
-            'NS': 'UNK',
-            'N': 'UNK',
-            'U': 'UNK',
-            None: 'UNK'
-        })
-        df['sex'] = df['sex'].fillna('UNK')
+        age_years = pd.Series(np.nan, index=demo_df.index)
+        age_group = 'Unknown'
+
+    # Clean sex field (standardized in one pass)
+    if 'sex' in demo_df.columns:
+        sex = demo_df['sex'].str.upper().str.strip()
+        sex = sex.where(~sex.isin(('', 'NS', 'N', 'U')), 'UNK').fillna('UNK')
     else:
-        df['sex'] = 'UNK'
-    
-    return df
+        sex = 'UNK'
+
+    return demo_df.assign(age_years=age_years, age_group=age_group, sex=sex)
 
@@ -1,6 +1,9 @@
 """Drug name normalization and matching utilities."""
 
+import hashlib
+import pickle
 import re
+from functools import lru_cache
 from typing import List, Dict, Set, Optional
 import yaml
 import pandas as pd
@@ -14,7 +17,10 @@ except ImportError:
 
 class DrugNormalizer:
     """Normalize drug names from FAERS to standardized drug classes."""
-    
+
+    # Common salt/counter-ion suffixes stripped during fallback matching
+    _SALT_RE = re.compile(r'\s+(HCL|HYDROCHLORIDE|CALCIUM|SODIUM|POTASSIUM)$')
+
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize drug normalizer with configuration.
@@ -30,7 +36,55 @@ class DrugNormalizer:
         
         # Build mapping dictionaries
         self._build_mappings()
-    
+
+        # Per-instance LRU cache: FAERS drug names are highly repetitive,
+        # so repeat strings short-circuit to a dict probe instead of
+        # re-running the regex cleanup, substring scan, and fuzzy path
+        self._normalize_upper = lru_cache(maxsize=200_000)(self._normalize_upper_impl)
+
+    def __getstate__(self):
+        # The per-instance lru_cache wrapper is not picklable; drop it
+        # and rebuild on unpickle
+        state = self.__dict__.copy()
+        state.pop('_normalize_upper', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._normalize_upper = lru_cache(maxsize=200_000)(self._normalize_upper_impl)
+
+    @classmethod
+    def load_or_build(cls, cache_dir, config_path: Optional[str] = None) -> 'DrugNormalizer':
+        """
+        Load a pickled normalizer from cache_dir, or build and cache one.
+
+        The cache filename embeds a hash of the config bytes, so editing
+        drug_list.yaml invalidates stale pickles automatically.
+
+        Args:
+            cache_dir: Directory for cached pickles
+            config_path: Path to drug_list.yaml. If None, uses default location.
+
+        Returns:
+            DrugNormalizer instance
+        """
+        if config_path is None:
+            config_path = Path(__file__).parent.parent.parent / "config" / "drug_list.yaml"
+
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.blake2b(Path(config_path).read_bytes(), digest_size=16).hexdigest()
+        cache_path = cache_dir / f"drug_normalizer_{digest}.pkl"
+
+        if cache_path.exists():
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+
+        instance = cls(config_path)
+        with open(cache_path, 'wb') as f:
+            pickle.dump(instance, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return instance
+
     def _build_mappings(self):
         """Build internal mappings for fast lookup."""
         self.brand_to_generic: Dict[str, str] = {}
@@ -68,6 +122,36 @@ class DrugNormalizer:
         # Add target drugs from config
         for drug in self.config.get('target_drugs', []):
             self.target_drugs.add(drug.upper().strip())
+
+        # Character-trigram inverted index over target drugs: fuzzy
+        # matching probes this to get a candidate shortlist instead of
+        # scoring every target per query
+        self._trigram_index: Dict[str, Set[str]] = {}
+        for target in self.target_drugs:
+            for gram in self._char_trigrams(target):
+                self._trigram_index.setdefault(gram, set()).add(target)
+
+        # Substring containment against target drugs as two single
+        # C-level scans instead of a Python loop per lookup: an
+        # alternation regex finds targets inside the query (longest
+        # first), and a NUL-delimited blob finds the query inside a
+        # target
+        targets_by_len = sorted(self.target_drugs, key=len, reverse=True)
+        if targets_by_len:
+            self._target_contained_re = re.compile(
+                '|'.join(re.escape(t) for t in targets_by_len)
+            )
+        else:
+            self._target_contained_re = None
+        self._targets_blob = '\x00' + '\x00'.join(targets_by_len) + '\x00'
+
+    @staticmethod
+    def _char_trigrams(name: str) -> Set[str]:
+        """Character trigrams of a name with spaces stripped."""
+        compact = name.replace(' ', '')
+        if len(compact) < 3:
+            return {compact} if compact else set()
+        return {compact[i:i + 3] for i in range(len(compact) - 2)}
     
     def normalize_drug_name(self, drug_name: str) -> Optional[str]:
         """
@@ -81,34 +165,42 @@ class DrugNormalizer:
         """
         if not drug_name or pd.isna(drug_name):
             return None
-        
-        drug_upper = str(drug_name).upper().strip()
-        
+
+        return self._normalize_upper(str(drug_name).upper().strip())
+
+    def _normalize_upper_impl(self, drug_upper: str) -> Optional[str]:
+        """Normalize an already-uppercased drug name (cached per instance)."""
         # Direct match
         if drug_upper in self.generic_to_class:
             return drug_upper
-        
+
         # Brand name match
         if drug_upper in self.brand_to_generic:
             return self.brand_to_generic[drug_upper]
-        
+
         # Fuzzy matching for common misspellings/variations
         # Remove common suffixes/prefixes
-        cleaned = re.sub(r'\s+(HCL|HYDROCHLORIDE|CALCIUM|SODIUM|POTASSIUM)$', '', drug_upper)
+        cleaned = self._SALT_RE.sub('', drug_upper)
         if cleaned in self.generic_to_class:
             return cleaned
-        
-        # Check if contains target drug name
-        for target in self.target_drugs:
-            if target in drug_upper or drug_upper in target:
-                return target
-        
+
+        # Check if contains target drug name (or is contained in one)
+        if self._target_contained_re is not None:
+            match = self._target_contained_re.search(drug_upper)
+            if match:
+                return match.group(0)
+            pos = self._targets_blob.find(drug_upper) if drug_upper else -1
+            if pos >= 0:
+                start = self._targets_blob.rfind('\x00', 0, pos) + 1
+                end = self._targets_blob.index('\x00', pos)
+                return self._targets_blob[start:end]
+
         # Fuzzy matching for misspellings (Phase 2 enhancement)
         if FUZZY_AVAILABLE:
             best_match = self._fuzzy_match(drug_upper, threshold=0.85)
             if best_match:
                 return best_match
-        
+
         return None
     
     def _fuzzy_match(self, drug_name: str, threshold: float = 0.85) -> Optional[str]:
@@ -124,16 +216,32 @@ class DrugNormalizer:
         """
         if not FUZZY_AVAILABLE:
             return None
-        
+
+        # Shortlist candidates sharing at least half the query's trigrams,
+        # then only score the shortlist
+        query_grams = self._char_trigrams(drug_name)
+        if not query_grams:
+            return None
+
+        overlap: Dict[str, int] = {}
+        for gram in query_grams:
+            for target in self._trigram_index.get(gram, ()):
+                overlap[target] = overlap.get(target, 0) + 1
+
+        candidates = [
+            target for target, shared in overlap.items()
+            if shared / len(query_grams) >= 0.5
+        ]
+
         best_match = None
         best_ratio = 0.0
-        
-        for target in self.target_drugs:
+
+        for target in candidates:
             ratio = SequenceMatcher(None, drug_name, target).ratio()
             if ratio >= threshold and ratio > best_ratio:
                 best_ratio = ratio
                 best_match = target
-        
+
         return best_match
     
     def get_drug_class(self, drug_name: str) -> Optional[str]:
@@ -202,3 +310,87 @@ class DrugNormalizer:
             'drug_class': None
         }
 
+    def normalize_and_classify_batch(
+        self,
+        names: pd.Series,
+        ais: Optional[pd.Series] = None
+    ) -> pd.DataFrame:
+        """
+        Normalize and classify whole columns of drug names.
+
+        FAERS drug tables repeat the same strings millions of times, so
+        the per-string normalization is dispatched once per unique value
+        and mapped back with a hashed lookup instead of one Python call
+        per row. The two-column result can be assigned to a frame in a
+        single statement.
+
+        Args:
+            names: Series of raw drug names
+            ais: Series of active ingredients (preferred when present)
+
+        Returns:
+            DataFrame with 'normalized_name' and 'drug_class' columns,
+            aligned to names' index
+        """
+        # Prefer prod_ai when present (cleaner), matching normalize_and_classify
+        if ais is not None:
+            # The load path casts drugname/prod_ai to category, and
+            # where() cannot fill one categorical from another with
+            # different categories; the unique-value lookup below hashes
+            # strings anyway, so drop both to object first
+            if isinstance(ais.dtype, pd.CategoricalDtype):
+                ais = ais.astype(object)
+            if isinstance(names.dtype, pd.CategoricalDtype):
+                names = names.astype(object)
+            effective = ais.where(ais.notna() & (ais != ''), names)
+        else:
+            effective = names
+
+        name_lookup = {
+            name: self.normalize_drug_name(name)
+            for name in pd.unique(effective.dropna())
+        }
+        normalized = effective.map(name_lookup)
+        class_lookup = {
+            name: self.get_drug_class(name)
+            for name in pd.unique(normalized.dropna())
+        }
+
+        return pd.DataFrame({
+            'normalized_name': normalized,
+            'drug_class': normalized.map(class_lookup)
+        }, index=names.index)
+
+    def normalize_and_classify_frame(
+        self,
+        drug_df: pd.DataFrame,
+        drugname_col: str = 'drugname',
+        prod_ai_col: Optional[str] = 'prod_ai'
+    ) -> pd.DataFrame:
+        """
+        Normalize and classify every row of a drug table.
+
+        Thin wrapper over normalize_and_classify_batch that resolves
+        column names against the frame.
+
+        Args:
+            drug_df: Drug dataframe
+            drugname_col: Column with raw drug names
+            prod_ai_col: Column with active ingredients (preferred when set)
+
+        Returns:
+            DataFrame with 'normalized_name' and 'drug_class' columns,
+            aligned to drug_df's index
+        """
+        if drugname_col in drug_df.columns:
+            names = drug_df[drugname_col]
+        else:
+            names = pd.Series('', index=drug_df.index)
+
+        if prod_ai_col and prod_ai_col in drug_df.columns:
+            ais = drug_df[prod_ai_col]
+        else:
+            ais = None
+
+        return self.normalize_and_classify_batch(names, ais)
+
@@ -1,103 +1,219 @@
 """Load and combine FAERS tables."""
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from pathlib import Path
 from typing import List, Optional, Dict
 import yaml
 
 
+# Alternate raw column names for each standardized name, shared by
+# standardize_column_names and the parquet-cache column projection
+COLUMN_ALTERNATES: Dict[str, List[str]] = {
+    'caseid': ['primaryid', 'isr'],
+    'fda_dt': ['init_fda_dt'],
+    'drugname': ['drug', 'medicinalproduct'],
+    'prod_ai': ['prodai', 'active_substance_name'],
+    'pt': ['reaction_pt', 'meddra_pt'],
+}
+
+# Low-cardinality columns worth storing as category per table: equality
+# compares and groupbys then run on integer codes, and high-duplicate
+# columns like pt shrink to one string per distinct value
+CATEGORICAL_COLS: Dict[str, List[str]] = {
+    'DEMO': ['sex', 'age_cod'],
+    'DRUG': ['role_cod', 'drugname', 'prod_ai'],
+    'REAC': ['pt'],
+}
+
+
+def _read_faers_csv_arrow(
+    file_path: Path,
+    delimiter: str,
+    encoding: str
+) -> pd.DataFrame:
+    """
+    Parse a delimited FAERS dump with pyarrow's multithreaded reader.
+
+    Every column is forced to string, mirroring the pandas dtype=str
+    path, so typing decisions stay downstream; '' and '.' are treated
+    as nulls.
+
+    Args:
+        file_path: Path to table file
+        delimiter: Field delimiter
+        encoding: File encoding
+
+    Returns:
+        DataFrame of string columns
+    """
+    with open(file_path, 'r', encoding=encoding) as f:
+        header = f.readline().rstrip('\r\n')
+    names = header.split(delimiter)
+
+    table = pacsv.read_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(
+            block_size=64 << 20,
+            use_threads=True,
+            encoding=encoding
+        ),
+        parse_options=pacsv.ParseOptions(delimiter=delimiter),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in names},
+            strings_can_be_null=True,
+            null_values=['', '.']
+        ),
+    )
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
 def load_faers_table(
     file_path: Path,
     delimiter: str = '$',
     encoding: str = 'latin-1',
-    low_memory: bool = False
+    low_memory: bool = False,
+    columns: Optional[List[str]] = None
 ) -> pd.DataFrame:
     """
     Load a single FAERS table file.
-    
+
+    The delimited text is parsed once and cached as a parquet sibling
+    (same path, .parquet suffix); later loads read the cache with
+    columnar projection so only the requested columns are allocated.
+
     Args:
         file_path: Path to table file
         delimiter: Field delimiter (usually '$' or '|')
         encoding: File encoding
         low_memory: Whether to use low memory mode
-        
+        columns: Optional standardized column names to project; raw
+            alternates (e.g. primaryid for caseid) are included
+
     Returns:
         DataFrame with loaded data
     """
+    parquet_cache = file_path.with_suffix('.parquet')
+
+    # Serve the cache only if it is at least as new as the text dump,
+    # so a re-downloaded quarter invalidates its stale parquet
+    if parquet_cache.exists() and parquet_cache.stat().st_mtime >= file_path.stat().st_mtime:
+        usecols = None
+        if columns:
+            wanted = set(columns)
+            for col in columns:
+                wanted.update(COLUMN_ALTERNATES.get(col, []))
+            available = pq.read_schema(parquet_cache).names
+            usecols = [c for c in available if c in wanted] or None
+        table = pq.read_table(parquet_cache, columns=usecols)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    try:
+        df = _read_faers_csv_arrow(file_path, delimiter, encoding)
+        if df.shape[1] <= 1 and delimiter == '$':
+            # Wrong delimiter guess collapses everything into one column
+            df = _read_faers_csv_arrow(file_path, '|', encoding)
+    except Exception:
+        # Fall back to the pandas parser for anything Arrow rejects
+        try:
+            df = pd.read_csv(
+                file_path,
+                delimiter=delimiter,
+                encoding=encoding,
+                low_memory=low_memory,
+                dtype=str  # Read all as strings initially to avoid type issues
+            )
+        except Exception as e:
+            # Try pipe delimiter if $ fails
+            df = None
+            if delimiter == '$':
+                try:
+                    df = pd.read_csv(
+                        file_path,
+                        delimiter='|',
+                        encoding=encoding,
+                        low_memory=low_memory,
+                        dtype=str
+                    )
+                except Exception:
+                    pass
+            if df is None:
+                raise e
+
     try:
-        df = pd.read_csv(
-            file_path,
-            delimiter=delimiter,
-            encoding=encoding,
-            low_memory=low_memory,
-            dtype=str  # Read all as strings initially to avoid type issues
-        )
-        return df
-    except Exception as e:
-        # Try pipe delimiter if $ fails
-        if delimiter == '$':
-            try:
-                df = pd.read_csv(
-                    file_path,
-                    delimiter='|',
-                    encoding=encoding,
-                    low_memory=low_memory,
-                    dtype=str
-                )
-                return df
-            except:
-                pass
-        raise e
+        df.to_parquet(parquet_cache, row_group_size=262_144)
+    except OSError as e:
+        print(f"Warning: could not write parquet cache {parquet_cache}: {e}")
+
+    if columns:
+        wanted = set(columns)
+        for col in columns:
+            wanted.update(COLUMN_ALTERNATES.get(col, []))
+        keep = [c for c in df.columns if c in wanted]
+        if keep:
+            df = df[keep]
+    return df
 
 
 def load_quarter_tables(
     quarter: str,
     data_dir: Path,
-    tables: List[str] = ['DEMO', 'DRUG', 'REAC']
+    tables: List[str] = ['DEMO', 'DRUG', 'REAC'],
+    columns: Optional[Dict[str, List[str]]] = None
 ) -> Dict[str, pd.DataFrame]:
     """
     Load all tables for a single quarter.
-    
+
     Args:
         quarter: Quarter identifier (e.g., '2019Q1')
         data_dir: Base directory with unpacked FAERS data
         tables: List of table names to load
-        
+        columns: Optional per-table column projection
+
     Returns:
         Dictionary mapping table names to DataFrames
     """
     quarter_dir = data_dir / quarter.lower()
-    
+
     if not quarter_dir.exists():
         raise FileNotFoundError(f"Quarter directory not found: {quarter_dir}")
-    
+
+    # One readdir instead of a stat call per candidate filename
+    with os.scandir(quarter_dir) as it:
+        entries = {e.name.lower(): e.name for e in it if e.is_file()}
+
     loaded_tables = {}
-    
+
     for table in tables:
         # Try different filename patterns
         patterns = [
             f"{table.lower()}_{quarter.lower()}.txt",
-            f"{table}_{quarter}.txt",
             f"{table.lower()}.txt",
-            f"{table}.txt"
         ]
-        
+
         file_path = None
         for pattern in patterns:
-            candidate = quarter_dir / pattern
-            if candidate.exists():
-                file_path = candidate
+            name = entries.get(pattern)
+            if name is not None:
+                file_path = quarter_dir / name
                 break
-        
+
         if file_path is None:
             # List available files for debugging
-            available = list(quarter_dir.glob("*.txt"))
+            available = [n for n in entries.values() if n.endswith('.txt')]
             print(f"Warning: {table} not found for {quarter}. Available: {available[:5]}")
             continue
         
         try:
-            df = load_faers_table(file_path)
+            df = load_faers_table(
+                file_path,
+                columns=columns.get(table) if columns else None
+            )
             loaded_tables[table] = df
             print(f"Loaded {table} for {quarter}: {len(df)} rows")
         except Exception as e:
@@ -118,38 +234,23 @@ def standardize_column_names(df: pd.DataFrame, table_name: str) -> pd.DataFrame:
     Returns:
         DataFrame with standardized column names
     """
-    df = df.copy()
-    
-    # Standardize caseid/primaryid
-    if 'primaryid' in df.columns and 'caseid' not in df.columns:
-        df = df.rename(columns={'primaryid': 'caseid'})
-    elif 'isr' in df.columns and 'caseid' not in df.columns:
-        df = df.rename(columns={'isr': 'caseid'})
-    
-    # Standardize date columns
-    if 'init_fda_dt' in df.columns and 'fda_dt' not in df.columns:
-        df = df.rename(columns={'init_fda_dt': 'fda_dt'})
-    
-    # Standardize drug columns
-    if 'drugname' not in df.columns:
-        for alt in ['drug', 'medicinalproduct']:
-            if alt in df.columns:
-                df = df.rename(columns={alt: 'drugname'})
-                break
-    
-    if 'prod_ai' not in df.columns:
-        for alt in ['prodai', 'active_substance_name']:
-            if alt in df.columns:
-                df = df.rename(columns={alt: 'prod_ai'})
-                break
-    
-    # Standardize reaction columns
-    if 'pt' not in df.columns:
-        for alt in ['pt', 'reaction_pt', 'meddra_pt']:
-            if alt in df.columns:
-                df = df.rename(columns={alt: 'pt'})
-                break
-    
+    rename = {}
+    for std_name, alternates in COLUMN_ALTERNATES.items():
+        if std_name not in df.columns:
+            for alt in alternates:
+                if alt in df.columns:
+                    rename[alt] = std_name
+                    break
+
+    # One rename with the complete mapping; no defensive df.copy() —
+    # copy-on-write keeps the caller's frame untouched without
+    # duplicating every column up front
+    df = df.rename(columns=rename)
+
+    for col in CATEGORICAL_COLS.get(table_name, []):
+        if col in df.columns and df[col].dtype != 'category':
+            df[col] = df[col].astype('category')
+
     return df
 
 
@@ -157,43 +258,58 @@ def combine_quarters(
     quarters: List[str],
     data_dir: Path,
     tables: List[str] = ['DEMO', 'DRUG', 'REAC'],
-    standardize: bool = True
+    standardize: bool = True,
+    columns: Optional[Dict[str, List[str]]] = None
 ) -> Dict[str, pd.DataFrame]:
     """
     Load and combine tables across multiple quarters.
-    
+
     Args:
         quarters: List of quarter identifiers
         data_dir: Base directory with unpacked FAERS data
         tables: List of table names to load
         standardize: Whether to standardize column names
-        
+        columns: Optional per-table column projection (standardized
+            names); only these columns are read from cached parquet
+
     Returns:
         Dictionary mapping table names to combined DataFrames
     """
     combined = {table: [] for table in tables}
-    
-    for quarter in quarters:
-        quarter_tables = load_quarter_tables(quarter, data_dir, tables)
-        
+
+    # Quarterly dumps are independent and both the file reads and the
+    # Arrow parser release the GIL, so load them concurrently; map()
+    # preserves quarter order for the concat below
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(quarters)))) as executor:
+        per_quarter = list(executor.map(
+            lambda q: load_quarter_tables(q, data_dir, tables, columns=columns),
+            quarters
+        ))
+
+    for quarter, quarter_tables in zip(quarters, per_quarter):
         for table, df in quarter_tables.items():
             if standardize:
                 df = standardize_column_names(df, table)
-            
-            # Add quarter identifier
-            df['quarter'] = quarter
-            
-            combined[table].append(df)
-    
+
+            # Hand each quarter to Arrow right away (with its quarter
+            # tag); the final concat then merges chunks zero-copy
+            # instead of re-copying every column per pd.concat
+            arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+            arrow_table = arrow_table.append_column(
+                'quarter', pa.array([quarter] * len(df))
+            )
+            combined[table].append(arrow_table)
+
     # Concatenate all quarters
     result = {}
     for table in tables:
         if combined[table]:
-            result[table] = pd.concat(combined[table], ignore_index=True)
+            merged = pa.concat_tables(combined[table], promote_options='default')
+            result[table] = merged.to_pandas(split_blocks=True, self_destruct=True)
             print(f"Combined {table}: {len(result[table])} total rows")
         else:
             print(f"Warning: No data loaded for {table}")
             result[table] = pd.DataFrame()
-    
+
     return result
 
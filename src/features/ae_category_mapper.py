@@ -1,9 +1,12 @@
 """Map MedDRA Preferred Terms to adverse event categories."""
 
+import hashlib
+import pickle
 import re
 from typing import Dict, List, Set, Optional
 import yaml
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 
@@ -25,69 +28,134 @@ class AECategoryMapper:
         
         # Build mapping structures
         self._build_mappings()
-    
+
+    @classmethod
+    def load_or_build(cls, cache_dir, config_path: Optional[str] = None) -> 'AECategoryMapper':
+        """
+        Load a pickled mapper from cache_dir, or build and cache one.
+
+        Cache files are keyed by a hash of ae_mapping.yaml's bytes, so a
+        config edit rebuilds rather than serving a stale mapper.
+
+        Args:
+            cache_dir: Directory for cached pickles
+            config_path: Path to ae_mapping.yaml. If None, uses default location.
+
+        Returns:
+            AECategoryMapper instance
+        """
+        if config_path is None:
+            config_path = Path(__file__).parent.parent.parent / "config" / "ae_mapping.yaml"
+
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.blake2b(Path(config_path).read_bytes(), digest_size=16).hexdigest()
+        cache_path = cache_dir / f"ae_mapper_{digest}.pkl"
+
+        if cache_path.exists():
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+
+        instance = cls(config_path)
+        with open(cache_path, 'wb') as f:
+            pickle.dump(instance, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return instance
+
     def _build_mappings(self):
         """Build internal mappings for fast lookup."""
         self.exact_matches: Dict[str, str] = {}  # PT -> category
-        self.keyword_patterns: Dict[str, List[re.Pattern]] = {}  # category -> patterns
-        
+        self.keyword_patterns: Dict[str, re.Pattern] = {}  # category -> alternation pattern
+
         # Process all categories
         all_categories = {}
         all_categories.update(self.config.get('tier1_core_categories', {}))
         all_categories.update(self.config.get('tier2_extended_categories', {}))
-        
+
         for category, rules in all_categories.items():
             # Exact matches
             for pt in rules.get('exact_matches', []):
                 self.exact_matches[pt.upper()] = category
-            
-            # Keyword patterns
-            patterns = []
-            for keyword in rules.get('keywords', []):
-                # Create case-insensitive pattern
-                pattern = re.compile(rf'\b{re.escape(keyword.upper())}\b', re.IGNORECASE)
-                patterns.append(pattern)
-            
-            self.keyword_patterns[category] = patterns
+
+            # Keyword patterns: one alternation regex per category, so a
+            # PT costs one search per category instead of one per keyword
+            keywords = [re.escape(kw.upper()) for kw in rules.get('keywords', [])]
+            if keywords:
+                self.keyword_patterns[category] = re.compile(
+                    r'\b(?:' + '|'.join(keywords) + r')\b',
+                    re.IGNORECASE
+                )
+
+        # Memoized PT -> category results, shared across map calls
+        self._pt_lookup: Dict[str, Optional[str]] = {}
     
     def map_pt_to_category(self, pt: str) -> Optional[str]:
         """
         Map a MedDRA Preferred Term to an AE category.
-        
+
+        Results are memoized per PT on the instance: MedDRA is a
+        bounded vocabulary, so the table saturates quickly and repeat
+        lookups skip the regex scan entirely.
+
         Args:
             pt: MedDRA Preferred Term
-            
+
         Returns:
             AE category name, or None if no match
         """
         if not pt or pd.isna(pt):
             return None
-        
-        pt_upper = str(pt).upper().strip()
-        
+
+        try:
+            return self._pt_lookup[pt]
+        except KeyError:
+            pass
+
+        result = self._classify_pt(str(pt).upper().strip())
+        self._pt_lookup[pt] = result
+        return result
+
+    def _classify_pt(self, pt_upper: str) -> Optional[str]:
+        """Run the uncached exact-match and keyword scan for one PT."""
         # Check exact matches first (most reliable)
         if pt_upper in self.exact_matches:
             return self.exact_matches[pt_upper]
-        
-        # Check keyword patterns
-        for category, patterns in self.keyword_patterns.items():
-            for pattern in patterns:
-                if pattern.search(pt_upper):
-                    return category
-        
+
+        # Check keyword patterns (category order preserved)
+        for category, pattern in self.keyword_patterns.items():
+            if pattern.search(pt_upper):
+                return category
+
         return None
     
     def map_pts_to_categories(self, pts: pd.Series) -> pd.Series:
         """
         Map a series of PTs to categories.
-        
+
+        The regex matching runs once per unique PT (FAERS repeats a
+        small PT vocabulary across millions of reaction rows) and the
+        results are memoized on the instance, so repeated calls across
+        quarters only pay for terms they have not seen.
+
         Args:
             pts: Series of MedDRA Preferred Terms
-            
+
         Returns:
             Series of AE categories
         """
-        return pts.apply(self.map_pt_to_category)
+        cats = pts if isinstance(pts.dtype, pd.CategoricalDtype) else pts.astype('category')
+        categories = cats.cat.categories
+
+        for pt in categories:
+            self.map_pt_to_category(pt)
+
+        # Translate via one gather over integer codes: the lookup table
+        # has one slot per distinct PT plus a trailing None slot that
+        # the -1 codes (missing PTs) index into
+        lookup = np.array(
+            [self._pt_lookup.get(pt) for pt in categories] + [None],
+            dtype=object
+        )
+        return pd.Series(lookup[cats.cat.codes.to_numpy()], index=pts.index)
     
     def get_analysis_categories(self) -> List[str]:
         """Get list of categories to use for analysis."""
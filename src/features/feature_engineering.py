@@ -5,37 +5,42 @@ import numpy as np
 from typing import List, Optional
 
 
+# Co-medication keyword groups, matched as substrings of FAERS drug
+# names (simplified; expand as needed)
+CARDIO_KEYWORDS = ['LISINOPRIL', 'LOSARTAN', 'METOPROLOL', 'ATENOLOL', 'AMLODIPINE']
+INSULIN_KEYWORDS = ['INSULIN', 'LANTUS', 'NOVOLOG']
+_CARDIO_KEYWORD_RE = '|'.join(CARDIO_KEYWORDS)
+_INSULIN_KEYWORD_RE = '|'.join(INSULIN_KEYWORDS)
+
+# Age bin edges and labels (last label is the missing-age bucket)
+_AGE_EDGES = np.array([18, 45, 65, 75])
+_AGE_LABELS = ['<18', '18-44', '45-64', '65-74', '75+', 'Unknown']
+
+
 def bin_age(age: pd.Series) -> pd.Series:
     """
     Bin age into categories.
-    
+
+    One searchsorted pass over the whole column replaces a Python
+    comparison chain per row; the result is categorical, so downstream
+    frames store int8 codes instead of label strings.
+
     Args:
         age: Series of ages (numeric or string)
-        
+
     Returns:
-        Series of age group labels
+        Categorical series of age group labels
     """
     # Convert to numeric, handling string ages
-    age_numeric = pd.to_numeric(age, errors='coerce')
-    
-    def _bin_single(age_val):
-        if pd.isna(age_val):
-            return "Unknown"
-        
-        age_val = float(age_val)
-        
-        if age_val < 18:
-            return "<18"
-        elif age_val < 45:
-            return "18-44"
-        elif age_val < 65:
-            return "45-64"
-        elif age_val < 75:
-            return "65-74"
-        else:
-            return "75+"
-    
-    return age_numeric.apply(_bin_single)
+    arr = pd.to_numeric(age, errors='coerce').to_numpy(dtype=np.float64)
+
+    codes = np.searchsorted(_AGE_EDGES, arr, side='right')
+    codes = np.where(np.isnan(arr), len(_AGE_LABELS) - 1, codes)
+
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=_AGE_LABELS),
+        index=age.index
+    )
 
 
 def extract_year(date_series: pd.Series) -> pd.Series:
@@ -67,62 +72,52 @@ def create_polypharmacy_features(
     Returns:
         DataFrame with polypharmacy features per case
     """
-    # Count total drugs per case
-    drug_counts = drug_df.groupby(caseid_col).size().reset_index(name='n_drugs')
-    
-    # Count concomitant drugs (role = 'C')
+    # Total and concomitant (role = 'C') drug counts per case in one
+    # groupby pass instead of grouping the table twice
     role_col = 'role_cod' if 'role_cod' in drug_df.columns else 'role'
     if role_col in drug_df.columns:
-        concomitant = drug_df[drug_df[role_col] == 'C']
-    else:
-        concomitant = pd.DataFrame()
-    if len(concomitant) > 0:
-        concomitant_counts = concomitant.groupby(caseid_col).size().reset_index(name='n_concomitant_drugs')
+        is_concomitant = drug_df[role_col] == 'C'
     else:
-        concomitant_counts = pd.DataFrame({caseid_col: [], 'n_concomitant_drugs': []})
-    
-    # Check for specific drug classes in concomitant
-    # This is a simplified version - you'd expand this based on your needs
-    cardio_keywords = ['LISINOPRIL', 'LOSARTAN', 'METOPROLOL', 'ATENOLOL', 'AMLODIPINE']
-    insulin_keywords = ['INSULIN', 'LANTUS', 'NOVOLOG']
-    
-    def _has_keyword(drugs, keywords):
-        drugs_str = ' '.join(str(d).upper() for d in drugs if pd.notna(d))
-        return any(kw in drugs_str for kw in keywords)
+        is_concomitant = pd.Series(False, index=drug_df.index)
+    drug_counts = (
+        is_concomitant.groupby(drug_df[caseid_col])
+        .agg(n_drugs='size', n_concomitant_drugs='sum')
+        .reset_index()
+    )
     
+    # Check for specific drug classes in concomitant: one vectorized
+    # substring scan per keyword group, then an any() per case, instead
+    # of joining each case's drug names into a throwaway string
     # Get drugname column (may be named differently)
     drugname_col = 'drugname' if 'drugname' in drug_df.columns else 'prod_ai' if 'prod_ai' in drug_df.columns else None
     if drugname_col:
-        case_drugs = drug_df.groupby(caseid_col)[drugname_col].apply(list).reset_index()
-        case_drugs.columns = [caseid_col, 'drugname']
+        names_upper = drug_df[drugname_col].astype(str).str.upper()
+        case_flags = pd.DataFrame({
+            'has_cardio_comedication': (
+                names_upper.str.contains(_CARDIO_KEYWORD_RE, regex=True)
+                .groupby(drug_df[caseid_col]).any()
+            ),
+            'has_insulin': (
+                names_upper.str.contains(_INSULIN_KEYWORD_RE, regex=True)
+                .groupby(drug_df[caseid_col]).any()
+            ),
+        }).rename_axis(caseid_col).reset_index()
     else:
-        # Fallback: create empty list
-        case_drugs = drug_df.groupby(caseid_col).size().reset_index()
-        case_drugs['drugname'] = case_drugs.apply(lambda x: [], axis=1)
-    
-    case_drugs['has_cardio_comedication'] = case_drugs['drugname'].apply(
-        lambda x: _has_keyword(x, cardio_keywords)
-    )
-    case_drugs['has_insulin'] = case_drugs['drugname'].apply(
-        lambda x: _has_keyword(x, insulin_keywords)
-    )
-    
+        case_flags = drug_counts[[caseid_col]].copy()
+        case_flags['has_cardio_comedication'] = False
+        case_flags['has_insulin'] = False
+
     # Merge all features
     features = drug_counts.merge(
-        concomitant_counts,
-        on=caseid_col,
-        how='left'
-    ).merge(
-        case_drugs[['caseid', 'has_cardio_comedication', 'has_insulin']],
+        case_flags,
         on=caseid_col,
         how='left'
     )
-    
+
     # Fill missing values
-    features['n_concomitant_drugs'] = features['n_concomitant_drugs'].fillna(0)
     features['has_cardio_comedication'] = features['has_cardio_comedication'].fillna(False)
     features['has_insulin'] = features['has_insulin'].fillna(False)
-    
+
     return features
 
 
@@ -163,7 +158,12 @@ def create_ml_features(
         features['age_raw'] = np.nan
     
     if 'sex' in cases_df.columns:
-        features['sex'] = cases_df['sex'].fillna('Unknown')
+        sex = cases_df['sex']
+        if isinstance(sex.dtype, pd.CategoricalDtype) and 'Unknown' not in sex.cat.categories:
+            # sex arrives as category from the load path; the sentinel
+            # must be registered before fillna can assign it
+            sex = sex.cat.add_categories(['Unknown'])
+        features['sex'] = sex.fillna('Unknown')
     else:
         features['sex'] = 'Unknown'
     
@@ -189,52 +189,40 @@ def create_ml_features(
         merge_cols.append('drug_class')
     if 'normalized_name' in suspect_drugs.columns:
         merge_cols.append('normalized_name')
-    
-    # Merge with features
-    case_drugs = suspect_drugs[merge_cols].merge(
-        features,
-        on='caseid',
-        how='inner'
+
+    # Target labels (binary flags for each AE category): one crosstab
+    # pass yields the whole multi-hot matrix, already indexed by caseid
+    labels = (
+        pd.crosstab(reac_df['caseid'], reac_df['ae_category'])
+        .reindex(columns=ae_categories, fill_value=0)
+        .clip(upper=1)
+        .astype('int8')
     )
-    
+
+    polypharm = create_polypharmacy_features(drug_df).set_index('caseid')
+
+    # Index-aligned joins on one shared caseid index instead of a
+    # hash-join per merge: demographics attach with an inner join,
+    # polypharmacy and labels with left joins
+    case_drugs = (
+        suspect_drugs[merge_cols].set_index('caseid')
+        .join(features.set_index('caseid'), how='inner')
+        .join([polypharm, labels], how='left')
+        .reset_index()
+    )
+
     # Add drug_class if missing (set to 'unknown')
     if 'drug_class' not in case_drugs.columns:
         case_drugs['drug_class'] = 'unknown'
-    
-    # Add polypharmacy features
-    polypharm = create_polypharmacy_features(drug_df)
-    case_drugs = case_drugs.merge(
-        polypharm,
-        on='caseid',
-        how='left'
-    )
-    
+
     # Fill missing polypharmacy
     case_drugs['n_drugs'] = case_drugs['n_drugs'].fillna(1)  # At least the suspect drug
     case_drugs['n_concomitant_drugs'] = case_drugs['n_concomitant_drugs'].fillna(0)
     case_drugs['has_cardio_comedication'] = case_drugs['has_cardio_comedication'].fillna(False)
     case_drugs['has_insulin'] = case_drugs['has_insulin'].fillna(False)
-    
-    # Create target labels (binary flags for each AE category)
-    # Get reactions per case
-    case_reactions = reac_df.groupby('caseid')['ae_category'].apply(set).reset_index()
-    case_reactions.columns = ['caseid', 'ae_categories']
-    
-    # Merge with case_drugs
-    case_drugs = case_drugs.merge(
-        case_reactions,
-        on='caseid',
-        how='left'
-    )
-    
-    # Create binary flags
-    for category in ae_categories:
-        case_drugs[category] = case_drugs['ae_categories'].apply(
-            lambda cats: category in cats if isinstance(cats, set) else False
-        ).astype(int)
-    
-    # Drop intermediate columns
-    case_drugs = case_drugs.drop(columns=['ae_categories'], errors='ignore')
-    
+
+    # Cases without mapped reactions get all-zero labels
+    case_drugs[ae_categories] = case_drugs[ae_categories].fillna(0).astype('int8')
+
     return case_drugs
 
@@ -1,8 +1,38 @@
 """Disproportionality analysis (ROR/PRR) for pharmacovigilance."""
 
+import hashlib
 import pandas as pd
 import numpy as np
 from typing import Dict, Tuple, Optional, List
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    from joblib import Parallel, delayed
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+
+# Memoized drug x event pair counts keyed by a digest of the key
+# columns, so sensitivity reruns that only change thresholds skip the
+# grouped count and pay just the vectorized ROR/PRR pass
+_COUNTS_CACHE: Dict[str, pd.Series] = {}
 
 
 def compute_ror(
@@ -13,25 +43,42 @@ def compute_ror(
     
     ROR = (a/b) / (c/d) = (a*d) / (b*c)
     
+    Accepts scalars or same-shaped ndarrays; the array form computes
+    every pair in one vectorized pass.
+
     Args:
         a: Reports with both drug and event
         b: Reports with drug, without event
         c: Reports with event, without drug
         d: Reports with neither drug nor event
-        
+
     Returns:
-        Tuple of (ROR, CI_lower, CI_upper)
+        Tuple of (ROR, CI_lower, CI_upper); NaN when any cell is zero,
+        since the odds ratio and its log-scale CI are undefined there
     """
-    # Avoid division by zero
-    if b == 0 or c == 0:
+    if isinstance(a, np.ndarray):
+        a = a.astype(np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        c = np.asarray(c, dtype=np.float64)
+        d = np.asarray(d, dtype=np.float64)
+        bad = (a == 0) | (b == 0) | (c == 0) | (d == 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ror = np.where(bad, np.nan, (a * d) / np.maximum(b * c, 1.0))
+            se_log_ror = np.sqrt(1/a + 1/b + 1/c + 1/d)
+            log_ror = np.log(ror)
+            return (
+                ror,
+                np.exp(log_ror - 1.96 * se_log_ror),
+                np.exp(log_ror + 1.96 * se_log_ror)
+            )
+
+    # Any zero cell makes the odds ratio or its CI undefined
+    if a == 0 or b == 0 or c == 0 or d == 0:
         return (np.nan, np.nan, np.nan)
-    
-    if a == 0:
-        return (0.0, 0.0, 0.0)
-    
+
     # Compute ROR
-    ror = (a * d) / (b * c) if (b * c) > 0 else np.nan
-    
+    ror = (a * d) / (b * c)
+
     # Compute standard error of log(ROR)
     se_log_ror = np.sqrt(1/a + 1/b + 1/c + 1/d)
     
@@ -51,22 +98,51 @@ def compute_prr(
     
     PRR = (a / (a+b)) / (c / (c+d))
     
+    Accepts scalars or same-shaped ndarrays; the array form computes
+    every pair in one vectorized pass.
+
     Args:
         a: Reports with both drug and event
         b: Reports with drug, without event
         c: Reports with event, without drug
         d: Reports with neither drug nor event
-        
+
     Returns:
-        Tuple of (PRR, chi2_statistic)
+        Tuple of (PRR, chi2_statistic); NaN when the ratio is undefined
+        (empty margin or zero a/c cell)
     """
+    if isinstance(a, np.ndarray):
+        a = a.astype(np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        c = np.asarray(c, dtype=np.float64)
+        d = np.asarray(d, dtype=np.float64)
+        bad = (a == 0) | (c == 0) | (a + b == 0) | (c + d == 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prr = np.where(
+                bad,
+                np.nan,
+                (a / np.maximum(a + b, 1.0))
+                / np.maximum(c / np.maximum(c + d, 1.0), 1e-300)
+            )
+            n = a + b + c + d
+            expected_a = (a + b) * (a + c) / n
+            expected_b = (a + b) * (b + d) / n
+            expected_c = (c + d) * (a + c) / n
+            expected_d = (c + d) * (b + d) / n
+            chi2 = np.where(
+                bad,
+                np.nan,
+                ((a - expected_a) ** 2) / expected_a +
+                ((b - expected_b) ** 2) / expected_b +
+                ((c - expected_c) ** 2) / expected_c +
+                ((d - expected_d) ** 2) / expected_d
+            )
+        return (prr, chi2)
+
     # Avoid division by zero
-    if (a + b) == 0 or (c + d) == 0:
+    if (a + b) == 0 or (c + d) == 0 or a == 0 or c == 0:
         return (np.nan, np.nan)
-    
-    if a == 0:
-        return (0.0, 0.0)
-    
+
     # Compute PRR
     prr = (a / (a + b)) / (c / (c + d))
     
@@ -77,7 +153,12 @@ def compute_prr(
     expected_b = (a + b) * (b + d) / n
     expected_c = (c + d) * (a + c) / n
     expected_d = (c + d) * (b + d) / n
-    
+
+    # A zero margin (b + d or a + c empty) zeroes an expected count and
+    # leaves chi-square undefined; the array path yields 0/0 -> NaN
+    if expected_a == 0 or expected_b == 0 or expected_c == 0 or expected_d == 0:
+        return (prr, np.nan)
+
     # Chi-square (with continuity correction)
     chi2 = (
         ((a - expected_a) ** 2) / expected_a +
@@ -89,6 +170,31 @@ def compute_prr(
     return (prr, chi2)
 
 
+def expand_counts(
+    df: pd.DataFrame,
+    columns: List[str],
+    count_col: str = 'count'
+) -> pd.DataFrame:
+    """
+    Expand an aggregated count table into one row per report.
+
+    Vectorized replacement for iterating rows and appending one dict per
+    report: a single np.repeat gather replaces N Python iterations. Only
+    needed by callers that require report-level rows; the analysis itself
+    consumes counts directly via count_col.
+
+    Args:
+        df: Aggregated DataFrame with a count column
+        columns: Columns to keep in the expanded output
+        count_col: Column holding the per-row report count
+
+    Returns:
+        DataFrame with one row per report
+    """
+    idx = np.repeat(np.arange(len(df)), df[count_col].to_numpy())
+    return df.iloc[idx][columns].reset_index(drop=True)
+
+
 def build_contingency_table(
     df: pd.DataFrame,
     drug_col: str,
@@ -109,21 +215,174 @@ def build_contingency_table(
     Returns:
         Tuple of (a, b, c, d) counts
     """
+    # Four reusable masks as plain ndarrays (bitwise AND on bool arrays,
+    # no Series alignment overhead); b, c and d come from margin
+    # subtraction rather than re-filtering the frame per cell
+    drug_match = (df[drug_col] == drug_value).to_numpy()
+    event_match = (df[event_col] == event_value).to_numpy()
+    drug_known = df[drug_col].notna().to_numpy()
+    event_known = df[event_col].notna().to_numpy()
+
     # a: drug+ and event+
-    a = len(df[(df[drug_col] == drug_value) & (df[event_col] == event_value)])
-    
+    a = int((drug_match & event_match).sum())
+
     # b: drug+ and event- (exclude NaN)
-    b = len(df[(df[drug_col] == drug_value) & (df[event_col] != event_value) & (df[event_col].notna())])
-    
+    b = int((drug_match & event_known).sum()) - a
+
     # c: drug- and event+ (exclude NaN)
-    c = len(df[(df[drug_col] != drug_value) & (df[drug_col].notna()) & (df[event_col] == event_value)])
-    
+    c = int((event_match & drug_known).sum()) - a
+
     # d: drug- and event- (exclude NaN)
-    d = len(df[(df[drug_col] != drug_value) & (df[drug_col].notna()) & (df[event_col] != event_value) & (df[event_col].notna())])
-    
+    d = int((drug_known & event_known).sum()) - a - b - c
+
+    return (a, b, c, d)
+
+
+def build_contingency_table_codes(
+    drug_codes: np.ndarray,
+    drug_idx: int,
+    event_codes: np.ndarray,
+    event_idx: int
+) -> Tuple[int, int, int, int]:
+    """
+    Build a 2x2 contingency table from factorized integer codes.
+
+    Fast path for callers looping over many pairs: factorize the drug
+    and event columns once (pd.factorize, NaN -> -1), then each pair
+    costs four integer comparisons over contiguous buffers instead of
+    re-hashing Python strings per call. Cell semantics match
+    build_contingency_table, including NaN exclusion.
+
+    Args:
+        drug_codes: Integer codes for the drug column (-1 for missing)
+        drug_idx: Code of the target drug
+        event_codes: Integer codes for the event column (-1 for missing)
+        event_idx: Code of the target event
+
+    Returns:
+        Tuple of (a, b, c, d) counts
+    """
+    drug_match = drug_codes == drug_idx
+    event_match = event_codes == event_idx
+    drug_known = drug_codes >= 0
+    event_known = event_codes >= 0
+
+    a = int(np.count_nonzero(drug_match & event_match))
+    b = int(np.count_nonzero(drug_match & event_known)) - a
+    c = int(np.count_nonzero(event_match & drug_known)) - a
+    d = int(np.count_nonzero(drug_known & event_known)) - a - b - c
+
     return (a, b, c, d)
 
 
+def _ror_prr_arrays(
+    a: np.ndarray,
+    b: np.ndarray,
+    c: np.ndarray,
+    d: np.ndarray,
+    n_total: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute ROR/CI/PRR/chi2 for a full grid of 2x2 cells with NumPy.
+
+    Args:
+        a, b, c, d: Contingency cell arrays (same shape)
+        n_total: Total report count
+
+    Returns:
+        Tuple of (ror, ror_ci_low, ror_ci_high, prr, chi2) arrays
+    """
+    # Branchless guards: floor the denominators at 1 (cells are
+    # integer-valued, so any positive denominator is >= 1) and mask the
+    # undefined entries to NaN afterwards, matching the scalar
+    # compute_ror/compute_prr conventions
+    ror_bad = (a == 0) | (b == 0) | (c == 0) | (d == 0)
+    ror = np.where(ror_bad, np.nan, (a * d) / np.maximum(b * c, 1.0))
+
+    drug_total = a + b
+    event_total = c + d
+    prr_bad = (a == 0) | (c == 0) | (drug_total == 0) | (event_total == 0)
+    # Same operation order as the scalar path so results match bit for
+    # bit; the tiny floor only ever touches entries masked by prr_bad
+    prr = np.where(
+        prr_bad,
+        np.nan,
+        (a / np.maximum(drug_total, 1.0))
+        / np.maximum(c / np.maximum(event_total, 1.0), 1e-300)
+    )
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if NUMEXPR_AVAILABLE:
+            # numexpr fuses each CI chain into one blocked pass, so the
+            # se/log intermediates never round-trip through memory; bad
+            # cells already hold NaN in ror and propagate through
+            ror_ci_low = ne.evaluate(
+                'exp(log(ror) - 1.96 * sqrt(1/a + 1/b + 1/c + 1/d))'
+            )
+            ror_ci_high = ne.evaluate(
+                'exp(log(ror) + 1.96 * sqrt(1/a + 1/b + 1/c + 1/d))'
+            )
+        else:
+            se_log_ror = np.sqrt(1/a + 1/b + 1/c + 1/d)
+            log_ror = np.log(ror)
+            ror_ci_low = np.exp(log_ror - 1.96 * se_log_ror)
+            ror_ci_high = np.exp(log_ror + 1.96 * se_log_ror)
+        expected_a = (a + b) * (a + c) / n_total
+        expected_b = (a + b) * (b + d) / n_total
+        expected_c = (c + d) * (a + c) / n_total
+        expected_d = (c + d) * (b + d) / n_total
+        chi2 = np.where(
+            prr_bad,
+            np.nan,
+            ((a - expected_a) ** 2) / expected_a +
+            ((b - expected_b) ** 2) / expected_b +
+            ((c - expected_c) ** 2) / expected_c +
+            ((d - expected_d) ** 2) / expected_d
+        )
+
+    return ror, ror_ci_low, ror_ci_high, prr, chi2
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True, error_model='numpy')
+    def _ror_prr_kernel(a, b, c, d, n_total):  # pragma: no cover - needs numba
+        """JIT twin of _ror_prr_arrays: fused loops, no grid temporaries."""
+        n_drugs, n_events = a.shape
+        ror = np.full((n_drugs, n_events), np.nan)
+        ci_low = np.full((n_drugs, n_events), np.nan)
+        ci_high = np.full((n_drugs, n_events), np.nan)
+        prr = np.full((n_drugs, n_events), np.nan)
+        chi2 = np.full((n_drugs, n_events), np.nan)
+
+        for i in prange(n_drugs):
+            for j in range(n_events):
+                av, bv, cv, dv = a[i, j], b[i, j], c[i, j], d[i, j]
+
+                # Undefined cells stay NaN, as in the scalar functions
+                if av > 0 and bv > 0 and cv > 0 and dv > 0:
+                    r = (av * dv) / (bv * cv)
+                    se = np.sqrt(1/av + 1/bv + 1/cv + 1/dv)
+                    log_r = np.log(r)
+                    ror[i, j] = r
+                    ci_low[i, j] = np.exp(log_r - 1.96 * se)
+                    ci_high[i, j] = np.exp(log_r + 1.96 * se)
+
+                if av > 0 and cv > 0 and (av + bv) > 0 and (cv + dv) > 0:
+                    prr[i, j] = (av / (av + bv)) / (cv / (cv + dv))
+                    ea = (av + bv) * (av + cv) / n_total
+                    eb = (av + bv) * (bv + dv) / n_total
+                    ec = (cv + dv) * (av + cv) / n_total
+                    ed = (cv + dv) * (bv + dv) / n_total
+                    chi2[i, j] = (
+                        (av - ea) ** 2 / ea +
+                        (bv - eb) ** 2 / eb +
+                        (cv - ec) ** 2 / ec +
+                        (dv - ed) ** 2 / ed
+                    )
+
+        return ror, ci_low, ci_high, prr, chi2
+
+
 def run_disproportionality_analysis(
     df: pd.DataFrame,
     drug_col: str,
@@ -131,11 +390,17 @@ def run_disproportionality_analysis(
     event_col: str,
     event_list: List[str],
     min_count: int = 5,
-    min_drug_reports: int = 10
+    min_drug_reports: int = 10,
+    count_col: Optional[str] = None
 ) -> pd.DataFrame:
     """
     Run disproportionality analysis for all drug-event pairs.
-    
+
+    Accepts either one row per report, or a pre-aggregated table with a
+    count column (one row per drug-event pair). The aggregated form avoids
+    expanding counts into millions of duplicate rows: the 2x2 contingency
+    cells are just sums over the count matrix and its margins.
+
     Args:
         df: DataFrame with drug and event information
         drug_col: Column name for drug identifier
@@ -144,58 +409,116 @@ def run_disproportionality_analysis(
         event_list: List of events to analyze
         min_count: Minimum a value (drug+event co-occurrences)
         min_drug_reports: Minimum total reports with drug (a + b)
-        
+        count_col: Optional column with report counts per drug-event pair.
+            If None, each row is counted as one report.
+
     Returns:
         DataFrame with ROR, PRR, and statistics for each drug-event pair
     """
-    results = []
-    
-    for drug in drug_list:
-        # Filter to cases with this drug
-        drug_cases = df[df[drug_col] == drug]
-        
-        # Check minimum drug reports
-        if len(drug_cases) < min_drug_reports:
-            continue
-        
-        for event in event_list:
-            # Build contingency table
-            a, b, c, d = build_contingency_table(
-                df, drug_col, drug, event_col, event
-            )
-            
-            # Apply minimum thresholds
-            if a < min_count:
-                continue
-            
-            if (a + b) < min_drug_reports:
-                continue
-            
-            # Compute metrics
-            ror, ror_ci_low, ror_ci_high = compute_ror(a, b, c, d)
-            prr, chi2 = compute_prr(a, b, c, d)
-            
-            # Determine if signal
-            is_signal_ror = (ror > 2.0) and (ror_ci_low > 1.0)
-            is_signal_prr = (prr > 2.0) and (chi2 > 4.0) and (a >= 3)
-            is_signal = is_signal_ror or is_signal_prr
-            
-            results.append({
-                'drug': drug,
-                'event': event,
-                'a': a,
-                'b': b,
-                'c': c,
-                'd': d,
-                'ror': ror,
-                'ror_ci_low': ror_ci_low,
-                'ror_ci_high': ror_ci_high,
-                'prr': prr,
-                'chi2': chi2,
-                'is_signal': is_signal
-            })
-    
-    results_df = pd.DataFrame(results)
+    # Build the drug x event count matrix (null keys are dropped,
+    # matching build_contingency_table's NaN exclusion); cache hits
+    # reuse the counts from a previous call on the same data
+    hash_cols = [drug_col, event_col] + ([count_col] if count_col else [])
+    cache_key = hashlib.blake2b(
+        pd.util.hash_pandas_object(df[hash_cols], index=False).to_numpy().tobytes()
+        + '|'.join(hash_cols).encode(),
+        digest_size=16
+    ).hexdigest()
+    if cache_key in _COUNTS_CACHE:
+        counts = _COUNTS_CACHE[cache_key]
+    elif POLARS_AVAILABLE and count_col is None:
+        # Polars' multithreaded hash aggregation counts the pairs in
+        # native code; the result feeds the same margin math below
+        grouped = (
+            pl.from_pandas(df[[drug_col, event_col]])
+            .lazy()
+            .drop_nulls()
+            .group_by([drug_col, event_col])
+            .agg(pl.len().alias('n'))
+            .collect()
+        )
+        counts = pd.Series(
+            grouped['n'].to_numpy(),
+            index=pd.MultiIndex.from_arrays([
+                grouped[drug_col].to_pandas().astype('category'),
+                grouped[event_col].to_pandas().astype('category'),
+            ]),
+        )
+    else:
+        # Grouping on categorical keys hashes integer codes instead of
+        # Python strings
+        keys = [df[drug_col].astype('category'), df[event_col].astype('category')]
+        if count_col is None:
+            counts = df.groupby(keys, observed=True).size()
+        else:
+            counts = df.groupby(keys, observed=True)[count_col].sum()
+    _COUNTS_CACHE[cache_key] = counts
+
+    count_matrix = (
+        counts.unstack(fill_value=0)
+        .reindex(index=drug_list, columns=event_list, fill_value=0)
+    )
+
+    # All 2x2 contingency cells at once. Margins are taken over the
+    # full table rather than the listed drugs/events, so b, c and d
+    # count unlisted values in their 'other' buckets exactly as the
+    # scalar build_contingency_table does
+    a = count_matrix.to_numpy(dtype=np.float64)
+    drug_totals = (
+        counts.groupby(level=0, observed=True).sum()
+        .reindex(drug_list, fill_value=0)
+        .to_numpy(dtype=np.float64)
+    )
+    event_totals = (
+        counts.groupby(level=1, observed=True).sum()
+        .reindex(event_list, fill_value=0)
+        .to_numpy(dtype=np.float64)
+    )
+    n_total = float(counts.sum())
+
+    b = drug_totals[:, None] - a
+    c = event_totals[None, :] - a
+    d = n_total - a - b - c
+
+    # ROR/CI/PRR/chi2 for the whole grid (same formulas as the scalar
+    # compute_ror/compute_prr); the numba kernel fuses the loops and
+    # skips the per-op grid temporaries when available
+    if NUMBA_AVAILABLE:
+        ror, ror_ci_low, ror_ci_high, prr, chi2 = _ror_prr_kernel(
+            a, b, c, d, n_total
+        )
+    else:
+        ror, ror_ci_low, ror_ci_high, prr, chi2 = _ror_prr_arrays(
+            a, b, c, d, n_total
+        )
+
+    # Signal criteria
+    is_signal_ror = (ror > 2.0) & (ror_ci_low > 1.0)
+    is_signal_prr = (prr > 2.0) & (chi2 > 4.0) & (a >= 3)
+    is_signal = is_signal_ror | is_signal_prr
+
+    # Apply minimum thresholds
+    keep = (
+        (a >= min_count) &
+        ((a + b) >= min_drug_reports) &
+        (drug_totals[:, None] >= min_drug_reports)
+    )
+    drug_idx, event_idx = np.nonzero(keep)
+
+    results_df = pd.DataFrame({
+        'drug': np.asarray(drug_list, dtype=object)[drug_idx],
+        'event': np.asarray(event_list, dtype=object)[event_idx],
+        'a': a[keep].astype(int),
+        'b': b[keep].astype(int),
+        'c': c[keep].astype(int),
+        'd': d[keep].astype(int),
+        'ror': ror[keep],
+        'ror_ci_low': ror_ci_low[keep],
+        'ror_ci_high': ror_ci_high[keep],
+        'prr': prr[keep],
+        'chi2': chi2[keep],
+        'is_signal': is_signal[keep]
+    })
     
     # Sort by ROR descending
     if len(results_df) > 0:
@@ -204,6 +527,32 @@ def run_disproportionality_analysis(
     return results_df
 
 
+def _run_stratum(
+    stratum_df: pd.DataFrame,
+    drug_col: str,
+    drug_list: List[str],
+    event_col: str,
+    event_list: List[str],
+    min_count: int,
+    min_drug_reports: int,
+    stratify_col: str,
+    stratum
+) -> pd.DataFrame:
+    """Analyze one stratum and tag its results (picklable for workers)."""
+    stratum_results = run_disproportionality_analysis(
+        stratum_df,
+        drug_col,
+        drug_list,
+        event_col,
+        event_list,
+        min_count=min_count,
+        min_drug_reports=min_drug_reports
+    )
+    if len(stratum_results) > 0:
+        stratum_results[stratify_col] = stratum
+    return stratum_results
+
+
 def run_stratified_analysis(
     df: pd.DataFrame,
     drug_col: str,
@@ -230,25 +579,31 @@ def run_stratified_analysis(
     Returns:
         DataFrame with stratified results
     """
-    results = []
-    
-    for stratum in df[stratify_col].dropna().unique():
-        stratum_df = df[df[stratify_col] == stratum]
-        
-        stratum_results = run_disproportionality_analysis(
-            stratum_df,
-            drug_col,
-            drug_list,
-            event_col,
-            event_list,
-            min_count=min_count,
-            min_drug_reports=min_drug_reports
+    strata = df[stratify_col].dropna().unique()
+
+    # Strata are independent, so fan them out across worker processes
+    # when joblib is available; each worker gets only its subframe
+    if JOBLIB_AVAILABLE and len(strata) > 1:
+        all_results = Parallel(n_jobs=-1)(
+            delayed(_run_stratum)(
+                df[df[stratify_col] == stratum],
+                drug_col, drug_list, event_col, event_list,
+                min_count, min_drug_reports, stratify_col, stratum
+            )
+            for stratum in strata
         )
-        
-        if len(stratum_results) > 0:
-            stratum_results[stratify_col] = stratum
-            results.append(stratum_results)
-    
+    else:
+        all_results = [
+            _run_stratum(
+                df[df[stratify_col] == stratum],
+                drug_col, drug_list, event_col, event_list,
+                min_count, min_drug_reports, stratify_col, stratum
+            )
+            for stratum in strata
+        ]
+
+    results = [r for r in all_results if len(r) > 0]
+
     if results:
         return pd.concat(results, ignore_index=True)
     else:
@@ -1,11 +1,54 @@
 """ROC curves and ML evaluation visualizations."""
 
+import hashlib
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional
-from sklearn.metrics import roc_curve, auc, precision_recall_curve
+from typing import List, Dict, Optional, Tuple
+
+
+# np.trapz became np.trapezoid in NumPy 2.0; support the declared
+# numpy>=1.24 floor as well
+_trapezoid = np.trapezoid if hasattr(np, 'trapezoid') else np.trapz
+
+# Memoized ROC curves keyed by a digest of the label/score matrices, so
+# replotting the same model skips the per-category sorts
+_ROC_CACHE: Dict[str, List[Tuple[np.ndarray, np.ndarray, float]]] = {}
+
+
+def compute_roc_batch(
+    y_true: np.ndarray,
+    y_scores: np.ndarray
+) -> List[Tuple[np.ndarray, np.ndarray, float]]:
+    """
+    Compute (fpr, tpr, auc) for every category with one shared sort.
+
+    One argsort over the whole score matrix replaces a sort per
+    category; only the tie-boundary extraction runs per column.
+
+    Args:
+        y_true: Binary label matrix (n_samples, n_categories)
+        y_scores: Score matrix, same shape
+
+    Returns:
+        List of (fpr, tpr, auc) per category
+    """
+    order = np.argsort(-y_scores, axis=0, kind='stable')
+    y_sorted = np.take_along_axis(y_true, order, axis=0)
+    s_sorted = np.take_along_axis(y_scores, order, axis=0)
+    tps = np.cumsum(y_sorted, axis=0, dtype=np.float64)
+    fps = np.cumsum(1 - y_sorted, axis=0, dtype=np.float64)
+
+    curves = []
+    for j in range(y_true.shape[1]):
+        # Evaluate only at the last entry of each tied-score run
+        distinct = np.nonzero(np.diff(s_sorted[:, j]))[0]
+        last = np.r_[distinct, y_true.shape[0] - 1]
+        tpr = np.r_[0.0, tps[last, j]] / max(tps[-1, j], 1.0)
+        fpr = np.r_[0.0, fps[last, j]] / max(fps[-1, j], 1.0)
+        curves.append((fpr, tpr, float(_trapezoid(tpr, fpr))))
+    return curves
 
 
 def plot_roc_curves(
@@ -28,21 +71,28 @@ def plot_roc_curves(
     n_categories = len(category_names)
     n_cols = 3
     n_rows = (n_categories + n_cols - 1) // n_cols
-    
+
     fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 5 * n_rows))
     axes = axes.flatten() if n_categories > 1 else [axes]
-    
+
+    y_true_np = y_true.to_numpy() if isinstance(y_true, pd.DataFrame) else np.asarray(y_true)
+    if y_true_np.ndim == 1:
+        y_true_np = y_true_np[:, None]
+    scores = y_pred_proba if y_pred_proba.ndim > 1 else y_pred_proba[:, None]
+
+    cache_key = hashlib.blake2b(
+        y_true_np.tobytes() + scores.tobytes() + model_name.encode(),
+        digest_size=16
+    ).hexdigest()
+    if cache_key not in _ROC_CACHE:
+        _ROC_CACHE[cache_key] = compute_roc_batch(y_true_np, scores)
+    curves = _ROC_CACHE[cache_key]
+
     for i, category in enumerate(category_names):
         ax = axes[i]
-        
-        # Get true and predicted for this category
-        y_true_cat = y_true.iloc[:, i].values if isinstance(y_true, pd.DataFrame) else y_true[:, i]
-        y_pred_cat = y_pred_proba[:, i] if y_pred_proba.ndim > 1 else y_pred_proba
-        
-        # Compute ROC curve
-        fpr, tpr, _ = roc_curve(y_true_cat, y_pred_cat)
-        roc_auc = auc(fpr, tpr)
-        
+
+        fpr, tpr, roc_auc = curves[i]
+
         # Plot
         ax.plot(fpr, tpr, linewidth=2, label=f'AUC = {roc_auc:.3f}')
         ax.plot([0, 1], [0, 1], 'k--', linewidth=1, alpha=0.5, label='Random')
@@ -71,16 +121,19 @@ def plot_feature_importance(
     importance_df: pd.DataFrame,
     target_category: Optional[str] = None,
     top_n: int = 15,
-    save_path: Optional[str] = None
+    save_path: Optional[str] = None,
+    ax: Optional[plt.Axes] = None
 ):
     """
     Plot feature importance from trained model.
-    
+
     Args:
         importance_df: DataFrame with feature importance (from get_feature_importance)
         target_category: Specific category to plot (None = aggregate)
         top_n: Number of top features to show
         save_path: Path to save figure
+        ax: Existing axes to draw on (cleared first), for figure reuse
+            across categories
     """
     if target_category:
         plot_df = importance_df[importance_df['target'] == target_category].copy()
@@ -93,9 +146,13 @@ def plot_feature_importance(
     
     # Get top N
     plot_df = plot_df.nlargest(top_n, 'importance')
-    
-    # Create figure
-    fig, ax = plt.subplots(figsize=(10, max(6, len(plot_df) * 0.4)))
+
+    # Create figure (or reuse the caller's axes)
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, max(6, len(plot_df) * 0.4)))
+    else:
+        fig = ax.figure
+        ax.clear()
     
     # Horizontal bar plot
     y_pos = np.arange(len(plot_df))
@@ -108,10 +165,10 @@ def plot_feature_importance(
     ax.invert_yaxis()
     ax.grid(True, alpha=0.3, axis='x')
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
         print(f"Saved feature importance to {save_path}")
     
     return fig, ax
@@ -1,6 +1,7 @@
 """Volcano plots for disproportionality analysis."""
 
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import seaborn as sns
 import pandas as pd
 import numpy as np
@@ -17,11 +18,12 @@ def plot_volcano(
     title: Optional[str] = None,
     save_path: Optional[str] = None,
     top_n: int = 10,
-    ror_threshold: float = 2.0
+    ror_threshold: float = 2.0,
+    ax: Optional[plt.Axes] = None
 ):
     """
     Create volcano plot for disproportionality analysis.
-    
+
     Args:
         results_df: DataFrame with disproportionality results
         drug_name: Name of drug to plot
@@ -32,42 +34,52 @@ def plot_volcano(
         save_path: Path to save figure
         top_n: Number of top signals to annotate
         ror_threshold: ROR threshold line to draw
+        ax: Existing axes to draw on (cleared first). When plotting many
+            drugs, reusing one figure avoids per-plot figure setup.
     """
     # Filter to drug
-    drug_df = results_df[results_df['drug'] == drug_name].copy()
-    
+    drug_df = results_df[results_df['drug'] == drug_name]
+
     if len(drug_df) == 0:
         print(f"No data found for {drug_name}")
         return
-    
-    # Prepare data
-    drug_df['log10_count'] = np.log10(drug_df[x_col] + 1)
-    drug_df['log2_ror'] = np.log2(drug_df[y_col] + 1e-6)  # Add small value to avoid log(0)
-    
-    # Create figure
-    fig, ax = plt.subplots(figsize=(10, 8))
-    
+
+    # Prepare data as plain numpy arrays (no intermediate columns);
+    # small offsets avoid log(0)
+    raw_y = drug_df[y_col].to_numpy(dtype=np.float64)
+    x_vals = np.log10(drug_df[x_col].to_numpy(dtype=np.float64) + 1)
+    y_vals = np.log2(raw_y + 1e-6)
+    codes, _ = pd.factorize(drug_df[color_col].to_numpy())
+    labels = drug_df[color_col].to_numpy()
+
+    # Create figure (or reuse the caller's axes)
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, 8))
+    else:
+        fig = ax.figure
+        ax.clear()
+
     # Scatter plot
     scatter = ax.scatter(
-        drug_df['log10_count'],
-        drug_df['log2_ror'],
-        c=drug_df[color_col].astype('category').cat.codes,
+        x_vals,
+        y_vals,
+        c=codes,
         cmap='tab10',
         alpha=0.6,
         s=50,
         edgecolors='black',
         linewidth=0.5
     )
-    
+
     # Add threshold line
     ax.axhline(y=np.log2(ror_threshold), color='red', linestyle='--', linewidth=2, label=f'ROR = {ror_threshold}')
-    
+
     # Annotate top signals
-    top_signals = drug_df.nlargest(top_n, y_col)
-    for idx, row in top_signals.iterrows():
+    top_idx = np.argsort(-raw_y)[:top_n]
+    for label, x, y in zip(labels[top_idx], x_vals[top_idx], y_vals[top_idx]):
         ax.annotate(
-            row[color_col],
-            (row['log10_count'], row['log2_ror']),
+            label,
+            (x, y),
             fontsize=8,
             alpha=0.8,
             bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.5)
@@ -81,13 +93,13 @@ def plot_volcano(
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.legend()
     ax.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    
+
+    fig.tight_layout()
+
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
         print(f"Saved volcano plot to {save_path}")
-    
+
     return fig, ax
 
 
@@ -116,23 +128,27 @@ def plot_heatmap(
         vmax: Maximum value for color scale
         cmap: Colormap name
     """
-    # Pivot to create matrix
-    pivot_df = results_df.pivot_table(
-        index=drug_col,
-        columns=event_col,
-        values=value_col,
-        aggfunc='mean'
+    # Pivot to create matrix (plain groupby + unstack skips
+    # pivot_table's extra machinery)
+    pivot_df = (
+        results_df.groupby([drug_col, event_col], sort=False)[value_col]
+        .mean()
+        .unstack()
+        .sort_index()
+        .sort_index(axis=1)
     )
-    
+
     # Clamp values for visualization
     if vmin is None:
         vmin = -2
     if vmax is None:
         vmax = 4
-    
-    # Apply log2 transform and clamp
-    pivot_df_log = np.log2(pivot_df + 1e-6)
-    pivot_df_log = pivot_df_log.clip(vmin, vmax)
+
+    # Apply log2 transform and clamp in place on the backing array
+    arr = pivot_df.to_numpy(dtype=np.float64, copy=True)
+    np.log2(arr + 1e-6, out=arr)
+    np.clip(arr, vmin, vmax, out=arr)
+    pivot_df_log = pd.DataFrame(arr, index=pivot_df.index, columns=pivot_df.columns)
     
     # Create figure
     fig, ax = plt.subplots(figsize=(12, 8))
@@ -202,16 +218,16 @@ def plot_forest_plot(
     fig, ax = plt.subplots(figsize=(10, max(6, len(event_df) * 0.5)))
     
     y_pos = np.arange(len(event_df))
-    
-    # Plot CI bars
-    for i, (idx, row) in enumerate(event_df.iterrows()):
-        ax.plot(
-            [row[ci_low_col], row[ci_high_col]],
-            [i, i],
-            'k-',
-            linewidth=2,
-            alpha=0.7
-        )
+
+    # Plot CI bars as one LineCollection artist instead of one ax.plot
+    # call (and full artist pipeline) per drug
+    lows = event_df[ci_low_col].to_numpy(dtype=np.float64)
+    highs = event_df[ci_high_col].to_numpy(dtype=np.float64)
+    segments = np.stack(
+        [np.stack([lows, y_pos], axis=1), np.stack([highs, y_pos], axis=1)],
+        axis=1
+    )
+    ax.add_collection(LineCollection(segments, colors='k', linewidths=2, alpha=0.7))
     
     # Plot ROR points
     ax.scatter(
@@ -2,7 +2,12 @@
 
 import pytest
 import numpy as np
-from src.models.disproportionality import compute_ror, compute_prr, build_contingency_table
+from src.models.disproportionality import (
+    compute_ror,
+    compute_prr,
+    build_contingency_table,
+    build_contingency_table_codes,
+)
 import pandas as pd
 
 
@@ -77,6 +82,25 @@ def test_build_contingency_table_with_nan():
     assert d >= 0, "d should be non-negative"
 
 
+def test_build_contingency_table_codes_matches_string_path():
+    """Code-based fast path should match the string-based table."""
+    df = pd.DataFrame({
+        'drug': ['A', 'A', 'A', 'B', np.nan],
+        'event': ['X', 'X', np.nan, 'X', 'X']
+    })
+
+    drug_codes, drug_labels = pd.factorize(df['drug'])
+    event_codes, event_labels = pd.factorize(df['event'])
+
+    expected = build_contingency_table(df, 'drug', 'A', 'event', 'X')
+    actual = build_contingency_table_codes(
+        drug_codes, list(drug_labels).index('A'),
+        event_codes, list(event_labels).index('X')
+    )
+
+    assert actual == expected, f"Expected {expected}, got {actual}"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
@@ -0,0 +1,47 @@
+"""Unit tests for batch drug normalization."""
+
+import pytest
+import pandas as pd
+from src.data_ingest.drug_normalizer import DrugNormalizer
+from src.data_ingest.load_faers import standardize_column_names
+
+
+def test_normalize_and_classify_frame_handles_categorical_columns():
+    """Batch path should accept frames from standardize_column_names."""
+    df = pd.DataFrame({
+        'caseid': ['1', '2', '3'],
+        'role_cod': ['PS', 'SS', 'PS'],
+        'drugname': ['OZEMPIC', 'GLUCOPHAGE', 'SOME OTHER DRUG'],
+        'prod_ai': ['SEMAGLUTIDE', None, ''],
+    })
+    df = standardize_column_names(df, 'DRUG')
+    assert df['drugname'].dtype == 'category', "Load path should deliver categoricals"
+    assert df['prod_ai'].dtype == 'category'
+
+    normalizer = DrugNormalizer()
+    result = normalizer.normalize_and_classify_frame(df)
+
+    assert list(result.columns) == ['normalized_name', 'drug_class']
+    assert len(result) == len(df)
+    assert result['normalized_name'].iloc[0] == 'SEMAGLUTIDE', "prod_ai should be preferred"
+    # Empty prod_ai falls back to drugname; unmatched names stay unmapped
+    assert pd.isna(result['normalized_name'].iloc[2])
+
+
+def test_normalize_and_classify_batch_matches_scalar_path():
+    """Batch results should agree with per-row normalize_and_classify."""
+    names = pd.Series(['OZEMPIC', 'METFORMIN', 'RAPAMUNE'])
+    ais = pd.Series([None, 'METFORMIN HYDROCHLORIDE', None])
+
+    normalizer = DrugNormalizer()
+    batch = normalizer.normalize_and_classify_batch(names, ais)
+
+    for i in range(len(names)):
+        scalar = normalizer.normalize_and_classify(names.iloc[i], ais.iloc[i])
+        batch_name = batch['normalized_name'].iloc[i]
+        assert (scalar['normalized_name'] == batch_name
+                or (scalar['normalized_name'] is None and pd.isna(batch_name)))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])